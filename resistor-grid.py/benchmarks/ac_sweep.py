@@ -0,0 +1,39 @@
+# -*- coding: utf8 -*-
+
+"""
+Benchmark of the AC frequency sweeps.
+It replaces the main resistor of a knight grid by a capacitor and a neighbouring one by an
+inductor, then prints the throughput (frequency points per second) of both solve methods.
+
+Usage: python benchmarks/ac_sweep.py [width] [points]
+"""
+import sys
+
+from resistor_grid.ac import CAPACITOR, INDUCTOR, ACAnalysis, Element, numpy
+from resistor_grid.circuit import create_knight_grid
+
+
+def main():
+    """
+    Runs the benchmark
+    :return:
+    """
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    points = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    circuit = create_knight_grid(width, open_value=None)
+    circuit.set(0, 1, Element(CAPACITOR, 1e-3))
+    node = next(node for node, _, _ in circuit.get_edges(skip_default=True) if node > 1)
+    neighbour = next(iter(circuit.resistors[node]))
+    circuit.set(node, neighbour, Element(INDUCTOR, 1e-3))
+
+    analysis = ACAnalysis(circuit)
+    frequencies = numpy.logspace(0, 6, points)
+    print(u"Knight grid {}, {} unknowns, {} frequencies".format(width, analysis.size, points))
+    for method in (u"dense", u"sparse"):
+        sweep = analysis.sweep(frequencies, method)
+        print(u"{:<8} {:>10.3f}s {:>12.0f} points/s".format(
+            method, sweep.seconds, sweep.get_points_per_second()))
+
+
+if __name__ == u"__main__":
+    main()
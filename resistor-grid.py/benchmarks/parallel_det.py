@@ -0,0 +1,44 @@
+# -*- coding: utf8 -*-
+
+"""
+Benchmark of the parallel Bareiss elimination.
+It computes the determinant of the mesh matrix of a knight grid with 1, 2, 4, ... worker
+processes (up to the number of cores) and prints the time and speedup for each core count.
+
+Usage: python benchmarks/parallel_det.py [width]
+"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import sys
+import time
+
+from resistor_grid.circuit import create_knight_grid
+from resistor_grid.polynomial import Polynomial
+
+
+def main():
+    """
+    Runs the benchmark
+    :return:
+    """
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    mat = create_knight_grid(width).get_matrix(
+        null_value=Polynomial([0]), neutral_value=Polynomial([1]))
+    print(u"Knight grid {}, matrix of size {}".format(width, mat.get_size()[0]))
+
+    workers = 1
+    reference = None
+    while workers <= multiprocessing.cpu_count():
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            start = time.time()
+            mat.compute_det(workers=workers, executor=executor)
+            duration = time.time() - start
+        if reference is None:
+            reference = duration
+        print(u"{} workers: {:.3f}s (speedup {:.2f})".format(
+            workers, duration, reference / duration))
+        workers *= 2
+
+
+if __name__ == u"__main__":
+    main()
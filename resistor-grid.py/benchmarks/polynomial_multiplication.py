@@ -0,0 +1,73 @@
+# -*- coding: utf8 -*-
+
+"""
+Benchmark of the polynomial multiplication algorithms.
+It prints the time of each algorithm for growing lengths and coefficient sizes, and the length
+from which each fast algorithm beats the schoolbook product (the crossover point).
+
+Usage: python benchmarks/polynomial_multiplication.py
+"""
+import random
+import timeit
+
+from resistor_grid.polynomial import karatsuba_multiply, kronecker_multiply, \
+    schoolbook_multiply
+
+LENGTHS = (2, 4, 6, 8, 12, 16, 24, 32, 48, 64, 128, 256)
+BITS = (8, 64, 512)
+ALGORITHMS = (
+    (u"schoolbook", schoolbook_multiply),
+    (u"karatsuba", karatsuba_multiply),
+    (u"kronecker", kronecker_multiply),
+)
+
+
+def measure(function, coefficients1, coefficients2):
+    """
+    Returns the mean time (in seconds) of one call to `function`
+    :param function:
+    :param coefficients1:
+    :param coefficients2:
+    :return:
+    """
+    timer = timeit.Timer(lambda: function(coefficients1, coefficients2))
+    number, _ = timer.autorange()
+    return min(timer.repeat(3, number)) / number
+
+
+def random_coefficients(length, bits):
+    """
+    Returns `length` random signed coefficients of `bits` bits
+    :param length:
+    :param bits:
+    :return:
+    """
+    return [random.randint(-(1 << bits), 1 << bits) for _ in range(length)]
+
+
+def main():
+    """
+    Runs the benchmark
+    :return:
+    """
+    random.seed(0)
+    for bits in BITS:
+        print(u"Coefficients of {} bits".format(bits))
+        print(u"length".rjust(8) + u"".join(name.rjust(14) for name, _ in ALGORITHMS))
+        crossovers = {}
+        for length in LENGTHS:
+            coefficients1 = random_coefficients(length, bits)
+            coefficients2 = random_coefficients(length, bits)
+            times = [measure(function, coefficients1, coefficients2) for _, function in ALGORITHMS]
+            print(str(length).rjust(8) + u"".join(
+                u"{:.2f}us".format(time * 1e6).rjust(14) for time in times))
+            for (name, _), time in zip(ALGORITHMS[1:], times[1:]):
+                if time < times[0]:
+                    crossovers.setdefault(name, length)
+        for name, _ in ALGORITHMS[1:]:
+            print(u"{} beats schoolbook from length {}".format(name, crossovers.get(name)))
+        print(u"")
+
+
+if __name__ == u"__main__":
+    main()
@@ -0,0 +1,155 @@
+# -*- coding: utf8 -*-
+
+"""
+Benchmark suite of the hot paths: polynomial products and divisions, determinants of integer
+and polynomial matrices, and the construction of the knight grids and of their matrices.
+The results (best time of each case, in seconds) are saved as JSON and can be compared against a
+stored baseline to detect regressions and measure speedups.
+
+Usage: python benchmarks/suite.py [--max-width 3] [--output results.json]
+                                  [--baseline baseline.json] [--threshold 1.2]
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+
+from resistor_grid.circuit import create_knight_grid
+from resistor_grid.matrix import Matrix
+from resistor_grid.polynomial import Polynomial
+
+POLYNOMIAL_LENGTHS = (8, 32, 128)
+POLYNOMIAL_BITS = (16, 256)
+INTEGER_MATRIX_SIZES = (20, 40)
+
+
+def measure(function, repeat):
+    """
+    Returns the best time (in seconds) of one call to `function` over `repeat` measures
+    :param function:
+    :param repeat:
+    :return:
+    """
+    timer = timeit.Timer(function)
+    number, duration = timer.autorange()
+    if duration > 1.0:
+        return min([duration / number] + [timer.timeit(1) for _ in range(repeat - 1)])
+    return min(timer.repeat(repeat, number)) / number
+
+
+def random_polynomial(length, bits):
+    """
+    Returns a random polynomial of `length` coefficients of `bits` bits
+    :param length:
+    :param bits:
+    :return:
+    """
+    coefficients = [random.randint(-(1 << bits), 1 << bits) for _ in range(length - 1)]
+    return Polynomial(coefficients + [1 << bits])
+
+
+def get_cases(max_width):
+    """
+    Returns the list of the benchmark cases as `(name, function)` tuples
+    :param max_width:
+    :return:
+    """
+    random.seed(0)
+    cases = []
+    for length in POLYNOMIAL_LENGTHS:
+        for bits in POLYNOMIAL_BITS:
+            polynomial1 = random_polynomial(length, bits)
+            polynomial2 = random_polynomial(length, bits)
+            product = polynomial1 * polynomial2
+            cases.append((u"polynomial.mul[length={},bits={}]".format(length, bits),
+                          lambda p1=polynomial1, p2=polynomial2: p1 * p2))
+            cases.append((u"polynomial.div[length={},bits={}]".format(length, bits),
+                          lambda p=product, p2=polynomial2: p // p2))
+
+    for size in INTEGER_MATRIX_SIZES:
+        mat = Matrix([[random.randint(-9, 9) for _ in range(size)] for _ in range(size)])
+        cases.append((u"matrix.compute_det[integer,size={}]".format(size), mat.compute_det))
+        cases.append((u"matrix.compute_sparse_det[integer,size={}]".format(size),
+                      mat.compute_sparse_det))
+
+    for width in range(1, max_width + 1):
+        cases.append((u"circuit.create_knight_grid[width={}]".format(width),
+                      lambda w=width: create_knight_grid(w)))
+        circuit = create_knight_grid(width)
+        cases.append((u"circuit.get_matrix[width={}]".format(width),
+                      lambda c=circuit: c.get_matrix(Polynomial([0]), Polynomial([1]))))
+        mat = circuit.get_matrix(Polynomial([0]), Polynomial([1]))
+        if mat.get_size()[0] > 1:
+            cases.append((u"matrix.compute_det[knight,width={}]".format(width), mat.compute_det))
+            cases.append((u"matrix.compute_sparse_det[knight,width={}]".format(width),
+                          mat.compute_sparse_det))
+    return cases
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the comparison of `results` with `baseline` and returns the list of the regressions
+    (the cases slower than the baseline by more than the factor `threshold`)
+    :param results:
+    :param baseline:
+    :param threshold:
+    :return:
+    """
+    regressions = []
+    for name, duration in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference is None:
+            print(u"{:<55} {:>12.6f}s {:>12}".format(name, duration, u"(new)"))
+            continue
+        ratio = duration / reference
+        status = u""
+        if ratio > threshold:
+            status = u"REGRESSION"
+            regressions.append(name)
+        elif ratio < 1.0 / threshold:
+            status = u"faster"
+        print(u"{:<55} {:>12.6f}s {:>8.2f}x {}".format(name, duration, ratio, status))
+    return regressions
+
+
+def main(argv=None):
+    """
+    Runs the benchmark suite
+    :param argv:
+    :return:
+    """
+    parser = argparse.ArgumentParser(description=u"Benchmark suite of resistor_grid")
+    parser.add_argument(u"--max-width", type=int, default=3,
+                        help=u"largest knight grid width (default: 3)")
+    parser.add_argument(u"--repeat", type=int, default=3, help=u"measures per case")
+    parser.add_argument(u"--filter", default=u"", help=u"only run the cases containing this")
+    parser.add_argument(u"--output", help=u"path of the JSON file to save the results to")
+    parser.add_argument(u"--baseline", help=u"path of a JSON file of results to compare with")
+    parser.add_argument(u"--threshold", type=float, default=1.2,
+                        help=u"slowdown factor reported as a regression (default: 1.2)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, function in get_cases(args.max_width):
+        if args.filter in name:
+            results[name] = measure(function, args.repeat)
+            if args.baseline is None:
+                print(u"{:<55} {:>12.6f}s".format(name, results[name]))
+
+    if args.output is not None:
+        with open(args.output, u"w") as output_file:
+            json.dump({u"python": platform.python_version(), u"results": results},
+                      output_file, indent=2, sort_keys=True)
+
+    if args.baseline is not None:
+        with open(args.baseline, u"r") as baseline_file:
+            baseline = json.load(baseline_file)[u"results"]
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == u"__main__":
+    sys.exit(main())
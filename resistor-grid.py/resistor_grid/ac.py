@@ -0,0 +1,200 @@
+# -*- coding: utf8 -*-
+
+"""
+This module computes the impedance between two nodes of a circuit of resistors, inductors and
+capacitors for a whole array of frequencies.
+The resistors of the circuit are `Element`s, or numbers (resistances, see
+`laplacian.get_conductance`). For each frequency, the admittance matrix (the Laplacian with
+complex admittances) has the same non-zero coefficients: their positions and a fill-reducing
+order are computed once, then all the frequencies are assembled with a single sparse product and
+solved either together (batched dense solve along the frequency axis) or one by one (sparse LU
+without ordering). It requires the optional dependencies `numpy` and `scipy`.
+"""
+import logging
+import time
+
+from resistor_grid.laplacian import get_conductance
+from resistor_grid.numeric import ensure_numeric
+
+try:
+    import numpy
+    from scipy import sparse
+    from scipy.sparse import csgraph, linalg
+except ImportError:
+    numpy = None
+    sparse = None
+    csgraph = None
+    linalg = None
+
+LOGGER = logging.getLogger(u"resistor_grid")
+
+RESISTOR = u"R"
+INDUCTOR = u"L"
+CAPACITOR = u"C"
+KINDS = (RESISTOR, INDUCTOR, CAPACITOR)
+DENSE_LIMIT = 100
+
+
+class Element(object):
+    """
+    This class represents a resistor (in Ohm), an inductor (in Henry) or a capacitor (in Farad)
+    """
+    def __init__(self, kind, value):
+        if kind not in KINDS:
+            raise Exception(u"Unknown element: {}".format(kind))
+        self.kind = kind
+        self.value = value
+
+    def __str__(self):
+        return u"{}={}".format(self.kind, self.value)
+
+
+class ACSweep(object):
+    """
+    This class represents the result of a frequency sweep: the complex `impedances` for the
+    `frequencies`, and the time it took
+    """
+    def __init__(self, frequencies, impedances, seconds):
+        self.frequencies = frequencies
+        self.impedances = impedances
+        self.seconds = seconds
+
+    def get_points_per_second(self):
+        """
+        Returns the throughput of the sweep, in frequency points per second
+        :return:
+        """
+        if self.seconds == 0:
+            return float(u"inf")
+        return len(self.frequencies) / self.seconds
+
+
+class ACAnalysis(object):
+    """
+    This class prepares the frequency sweeps of the impedance between `node1` and `node2` of
+    `circuit`: it computes the structure of the admittance matrix (grounded at `node2`) once.
+    """
+    def __init__(self, circuit, node1=0, node2=1):
+        ensure_numeric()
+        if node1 == node2:
+            raise Exception(u"Cannot get impedance for same node")
+
+        self.elements = []
+        nodes1 = []
+        nodes2 = []
+        skip_default = get_conductance(circuit.default_value, exact=False) == 0
+        for edge_node1, edge_node2, value in circuit.get_edges(skip_default):
+            if not isinstance(value, Element):
+                conductance = get_conductance(value, exact=False)
+                if conductance == 0:
+                    continue
+                value = Element(RESISTOR, 1.0 / conductance)
+            self.elements.append(value)
+            nodes1.append(edge_node1)
+            nodes2.append(edge_node2)
+
+        # The nodes without the ground, in a fill-reducing order
+        size = circuit.size - 1
+        reduced = numpy.arange(circuit.size) - (numpy.arange(circuit.size) > node2)
+        reduced[node2] = -1
+        nodes1 = reduced[numpy.array(nodes1, dtype=numpy.int64)]
+        nodes2 = reduced[numpy.array(nodes2, dtype=numpy.int64)]
+        edges = numpy.arange(len(self.elements))
+        both = (nodes1 >= 0) & (nodes2 >= 0)
+        lines = numpy.concatenate((nodes1[nodes1 >= 0], nodes2[nodes2 >= 0], nodes1[both],
+                                   nodes2[both]))
+        columns = numpy.concatenate((nodes1[nodes1 >= 0], nodes2[nodes2 >= 0], nodes2[both],
+                                     nodes1[both]))
+        signs = numpy.concatenate((numpy.ones((nodes1 >= 0).sum()),
+                                   numpy.ones((nodes2 >= 0).sum()), -numpy.ones(2 * both.sum())))
+        contributions = numpy.concatenate((edges[nodes1 >= 0], edges[nodes2 >= 0], edges[both],
+                                           edges[both]))
+        pattern = sparse.csr_matrix((numpy.ones(len(lines)), (lines, columns)),
+                                    shape=(size, size))
+        self.order = csgraph.reverse_cuthill_mckee(pattern, symmetric_mode=True)
+        position = numpy.empty(size, dtype=numpy.int64)
+        position[self.order] = numpy.arange(size)
+        lines = position[lines]
+        columns = position[columns]
+
+        # `assembly` maps the admittances of the elements to the non-zero coefficients
+        keys = lines * size + columns
+        unique_keys, coefficient_indices = numpy.unique(keys, return_inverse=True)
+        self.lines = unique_keys // size
+        self.columns = unique_keys % size
+        self.assembly = sparse.csr_matrix((signs, (coefficient_indices, contributions)),
+                                          shape=(len(unique_keys), len(self.elements)))
+        self.size = size
+        self.index = position[reduced[node1]]
+
+    def get_admittances(self, pulsations):
+        """
+        Returns the array of shape (elements, frequencies) of the admittances of the elements
+        :param pulsations:
+        :return:
+        """
+        admittances = numpy.empty((len(self.elements), len(pulsations)), dtype=complex)
+        for kind in KINDS:
+            selected = [i for i, element in enumerate(self.elements) if element.kind == kind]
+            if selected:
+                values = numpy.array([self.elements[i].value for i in selected], dtype=float)
+                if kind == RESISTOR:
+                    admittances[selected] = (1.0 / values)[:, None]
+                elif kind == INDUCTOR:
+                    admittances[selected] = 1.0 / (1j * numpy.outer(values, pulsations))
+                else:
+                    admittances[selected] = 1j * numpy.outer(values, pulsations)
+        return admittances
+
+    def sweep(self, frequencies, method=u"auto"):
+        """
+        Returns the `ACSweep` of the impedances for the array `frequencies` (in Hertz, non zero)
+        `method` is "dense" (batched dense solve), "sparse" (one sparse LU per frequency) or
+        "auto" (dense for the small circuits)
+        :param frequencies:
+        :param method:
+        :return:
+        """
+        if method == u"auto":
+            method = u"dense" if self.size <= DENSE_LIMIT else u"sparse"
+        if method not in (u"dense", u"sparse"):
+            raise Exception(u"Unknown method: {}".format(method))
+
+        start = time.time()
+        frequencies = numpy.asarray(frequencies, dtype=float)
+        # One column of non-zero coefficients per frequency
+        data = self.assembly @ self.get_admittances(2.0 * numpy.pi * frequencies)
+        count = len(frequencies)
+        if method == u"dense":
+            mats = numpy.zeros((count, self.size, self.size), dtype=complex)
+            mats[:, self.lines, self.columns] = data.T
+            rhs = numpy.zeros((count, self.size, 1), dtype=complex)
+            rhs[:, self.index, 0] = 1.0
+            impedances = numpy.linalg.solve(mats, rhs)[:, self.index, 0]
+        else:
+            rhs = numpy.zeros(self.size, dtype=complex)
+            rhs[self.index] = 1.0
+            impedances = numpy.empty(count, dtype=complex)
+            for point in range(count):
+                mat = sparse.csc_matrix((data[:, point], (self.lines, self.columns)),
+                                        shape=(self.size, self.size))
+                solution = linalg.splu(mat, permc_spec=u"NATURAL").solve(rhs)
+                impedances[point] = solution[self.index]
+        result = ACSweep(frequencies, impedances, time.time() - start)
+        LOGGER.info(u"%d frequency points in %.3fs (%.0f points per second)", count,
+                    result.seconds, result.get_points_per_second())
+        return result
+
+
+def compute_impedances(circuit, frequencies, node1=0, node2=1, method=u"auto"):
+    """
+    Returns the `ACSweep` of the impedances between `node1` and `node2` of `circuit` for the array
+    `frequencies`
+    :param circuit:
+    :param frequencies:
+    :param node1:
+    :param node2:
+    :param method:
+    :return:
+    """
+    return ACAnalysis(circuit, node1, node2).sweep(frequencies, method)
@@ -0,0 +1,153 @@
+# -*- coding: utf8 -*-
+
+"""
+This module stores the results of the solved circuits on disk, so they are not computed again.
+The results are addressed by a hash of the circuit: its size, its default value, its other
+resistors and its terminals. The nodes are relabeled as `compute_mesh_resistance` does (the
+terminals are swapped into the nodes 0 and 1), so the same problem always gives the same key.
+
+Each entry is a file of the cache directory holding a compressed pickle of a dict (such as
+`{"resistance": Fraction(73, 69)}`, determinants or a factorization). The least recently used
+files are removed when the directory grows beyond `max_bytes`.
+"""
+from fractions import Fraction
+import hashlib
+import os
+import pickle
+import tempfile
+import zlib
+
+from resistor_grid.circuit import get_label
+from resistor_grid.polynomial import Polynomial
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def encode_value(value):
+    """
+    Returns a canonical string representing the value of a resistor
+    :param value:
+    :return:
+    """
+    if value is None:
+        return u"none"
+    if isinstance(value, Polynomial):
+        return u"p({})".format(u",".join(encode_value(coefficient)
+                                         for coefficient in value.coefficients))
+    if isinstance(value, (int, Fraction)):
+        return u"q{}".format(Fraction(value))
+    if isinstance(value, float):
+        return u"f{!r}".format(value)
+    return u"{}:{!r}".format(type(value).__name__, value)
+
+
+def get_circuit_key(circuit, node1=0, node2=1, namespace=u""):
+    """
+    Returns the key (a hexadecimal string) of the problem of the resistance between `node1` and
+    `node2` of `circuit`. The `namespace` separates the results of different computations.
+    :param circuit:
+    :param node1:
+    :param node2:
+    :param namespace:
+    :return:
+    """
+    default = encode_value(circuit.default_value)
+    edges = []
+    for edge_node1, edge_node2, value in circuit.get_edges(skip_default=True):
+        encoded = encode_value(value)
+        if encoded != default:
+            label1 = get_label(edge_node1, node1, node2)
+            label2 = get_label(edge_node2, node1, node2)
+            edges.append((min(label1, label2), max(label1, label2), encoded))
+    edges.sort()
+
+    digest = hashlib.sha256()
+    digest.update(u"{}\n{}\n{}\n".format(namespace, circuit.size, default).encode(u"utf8"))
+    for edge in edges:
+        digest.update(u"{} {} {}\n".format(*edge).encode(u"utf8"))
+    return digest.hexdigest()
+
+
+class ResultCache(object):
+    """
+    This class represents the directory `directory` of cached results, bounded to `max_bytes`.
+    """
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def get_path(self, key):
+        """
+        Returns the path of the file of the entry `key`
+        :param key:
+        :return:
+        """
+        return os.path.join(self.directory, key + u".pickle.z")
+
+    def get(self, key):
+        """
+        Returns the entry `key` (a dict), or None if it is not cached
+        :param key:
+        :return:
+        """
+        path = self.get_path(key)
+        try:
+            with open(path, u"rb") as entry_file:
+                entry = pickle.loads(zlib.decompress(entry_file.read()))
+        except (IOError, OSError, zlib.error, pickle.UnpicklingError, EOFError):
+            return None
+        try:
+            # The modification time orders the entries for the eviction
+            os.utime(path, None)
+        except OSError:
+            # The entry was evicted meanwhile by another process
+            pass
+        return entry
+
+    def put(self, key, entry):
+        """
+        Stores the entry `key` (a dict) and evicts the least recently used entries if the cache
+        is too large
+        :param key:
+        :param entry:
+        :return:
+        """
+        data = zlib.compress(pickle.dumps(entry, pickle.HIGHEST_PROTOCOL))
+        # Written then renamed, so a concurrent reader never sees a partial file
+        handle, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=u".tmp")
+        with os.fdopen(handle, u"wb") as entry_file:
+            entry_file.write(data)
+        os.replace(temporary_path, self.get_path(key))
+        self.evict()
+
+    def update(self, key, **values):
+        """
+        Adds `values` to the entry `key`
+        :param key:
+        :param values:
+        :return:
+        """
+        entry = self.get(key) or {}
+        entry.update(values)
+        self.put(key, entry)
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in `max_bytes`
+        :return:
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(u".pickle.z"):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, name, stat.st_size))
+                total += stat.st_size
+        entries.sort()
+        for _, name, size in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
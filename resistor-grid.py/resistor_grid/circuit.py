@@ -18,6 +18,7 @@ class Circuit(object):
         :param default_value:
         """
         self.size = size
+        self.default_value = None
         self.resistors = None
         self.fill(default_value)
 
@@ -27,6 +28,7 @@ class Circuit(object):
         :param fill_value:
         :return:
         """
+        self.default_value = fill_value
         self.resistors = [[fill_value] * j for j in range(self.size)]
 
     def get(self, node1, node2):
@@ -96,6 +98,19 @@ class Circuit(object):
                 if self.resistors[i][j] is None:
                     raise Exception(u"Missing resistor value between {} and {}".format(j, i))
 
+    def get_edges(self, skip_default=False):
+        """
+        Yields the tuple `(node1, node2, value)` for each pair of distinct nodes (node1 < node2)
+        If `skip_default` is true, the pairs still at the default value may be skipped.
+        :param skip_default:
+        :return:
+        """
+        for i in range(self.size):
+            for j in range(i):
+                value = self.get(j, i)
+                if not skip_default or value is not self.default_value:
+                    yield j, i, value
+
     def get_matrix(self, null_value=0, neutral_value=1):
         """
         Returns the matrix associated to the circuit.
@@ -144,37 +159,222 @@ class Circuit(object):
         return Matrix(mat)
 
 
-def create_grid(width, height):
+class SparseCircuit(Circuit):
+    """
+    This class represents an electrical circuit where most of the pairs of nodes keep the
+    default value (typically: no resistor).
+    Only the other values are stored, in the adjacency list `resistors`: `resistors[i]` maps each
+    neighbour of the node `i` to the value of the resistor between them.
+    """
+    def fill(self, fill_value):
+        """
+        Resets all the resistors to `default_value`
+        :param fill_value:
+        :return:
+        """
+        self.default_value = fill_value
+        self.resistors = [{} for _ in range(self.size)]
+
+    def get(self, node1, node2):
+        """
+        Returns the value of the resistor between `node1` and `node2`
+        :param node1:
+        :param node2:
+        :return:
+        """
+        if node1 == node2:
+            raise Exception(u"Cannot get resistor for same node")
+
+        return self.resistors[node1].get(node2, self.default_value)
+
+    def set(self, node1, node2, value):
+        """
+        Sets the value of the resistor between `node1` and `node2`
+        :param node1:
+        :param node2:
+        :param value:
+        :return:
+        """
+        if node1 == node2:
+            raise Exception(u"Cannot set resistor for same node")
+
+        if value is self.default_value:
+            self.resistors[node1].pop(node2, None)
+            self.resistors[node2].pop(node1, None)
+        else:
+            self.resistors[node1][node2] = value
+            self.resistors[node2][node1] = value
+
+    def swap_nodes(self, node1, node2):
+        """
+        This method swaps the nodes node1 and node2
+        :param node1:
+        :param node2:
+        :return:
+        """
+        if node1 == node2:
+            return
+
+        neighbours1 = self.resistors[node1]
+        neighbours2 = self.resistors[node2]
+        for node, neighbours in ((node1, neighbours1), (node2, neighbours2)):
+            for neighbour in neighbours:
+                if neighbour != node1 and neighbour != node2:
+                    del self.resistors[neighbour][node]
+
+        new_neighbours1 = {k: v for k, v in neighbours2.items() if k != node1}
+        new_neighbours2 = {k: v for k, v in neighbours1.items() if k != node2}
+        if node2 in neighbours1:
+            new_neighbours1[node2] = neighbours1[node2]
+            new_neighbours2[node1] = neighbours1[node2]
+        self.resistors[node1] = new_neighbours1
+        self.resistors[node2] = new_neighbours2
+
+        for node, neighbours in ((node1, new_neighbours1), (node2, new_neighbours2)):
+            for neighbour, value in neighbours.items():
+                if neighbour != node1 and neighbour != node2:
+                    self.resistors[neighbour][node] = value
+
+    def ensure_complete(self):
+        """
+        This method checks if all the values are known (not None).
+        It raises an exception otherwise
+        :return:
+        """
+        if self.default_value is None and self.size > 1:
+            for i in range(self.size):
+                for j in range(i):
+                    if j not in self.resistors[i]:
+                        raise Exception(
+                            u"Missing resistor value between {} and {}".format(j, i))
+
+        for i, neighbours in enumerate(self.resistors):
+            for j, value in neighbours.items():
+                if value is None:
+                    raise Exception(u"Missing resistor value between {} and {}".format(i, j))
+
+    def get_edges(self, skip_default=False):
+        """
+        Yields the tuple `(node1, node2, value)` for each pair of distinct nodes (node1 < node2)
+        If `skip_default` is true, only the stored values are yielded: O(edges) instead of
+        O(nodes²).
+        :param skip_default:
+        :return:
+        """
+        if not skip_default:
+            for edge in Circuit.get_edges(self):
+                yield edge
+            return
+
+        for i, neighbours in enumerate(self.resistors):
+            for j, value in neighbours.items():
+                if i < j:
+                    yield i, j, value
+
+
+def create_grid(width, height, open_value=Polynomial([0, 1])):
     """
     This creates a grid of resistors of size `width`×`height`
+    The pairs of nodes without resistor are set to `open_value`: the default models them as an
+    infinite resistor `x` (required by `get_matrix`), use `None` to leave them out. The nodal
+    solvers (see `resistor_grid.laplacian`) treat both as open circuits.
     :param width:
     :param height:
+    :param open_value:
     :return:
     """
     size = width * height
-    circuit = Circuit(size, default_value=Polynomial([0, 1]))
+    circuit = SparseCircuit(size, default_value=open_value)
+    unit = Polynomial([1])
     for i in range(width):
         for j in range(height):
             if i < width - 1:
-                circuit.set(j * width + i, j * width + i + 1, Polynomial([1]))
+                circuit.set(j * width + i, j * width + i + 1, unit)
             if j < height - 1:
-                circuit.set(j * width + i, (j + 1) * width + i, Polynomial([1]))
+                circuit.set(j * width + i, (j + 1) * width + i, unit)
     return circuit
 
 
-def create_knight_grid(width):
+def get_grid_offsets(width, height, node, radius):
+    """
+    Returns the list of the tuples `(dx, dy, other_node)` for the nodes of the grid of
+    `create_grid(width, height)` at most `radius` columns and lines away from `node` (except
+    `node` itself)
+    :param width:
+    :param height:
+    :param node:
+    :param radius:
+    :return:
+    """
+    column = node % width
+    line = node // width
+    offsets = []
+    for dy in range(max(-radius, -line), min(radius, height - 1 - line) + 1):
+        for dx in range(max(-radius, -column), min(radius, width - 1 - column) + 1):
+            if dx != 0 or dy != 0:
+                offsets.append((dx, dy, (line + dy) * width + column + dx))
+    return offsets
+
+
+def create_knight_grid(width, open_value=Polynomial([0, 1])):
     """
     This creates a grid circuit were the main resistor is a knight's move away
     :param width:
+    :param open_value:
+    :return:
+    """
+    circuit = create_grid(width, width + 1, open_value=open_value)
+    for node1, node2 in get_knight_swaps(width):
+        circuit.swap_nodes(node1, node2)
+    return circuit
+
+
+def get_knight_swaps(width):
+    """
+    Returns the pairs of nodes swapped by `create_knight_grid` to move the terminals (at the
+    positions `(column, line)` of the grid, numbered `line * width + column`) into 0 and 1
+    :param width:
     :return:
     """
-    circuit = create_grid(width, width + 1)
     if width % 2 == 0:
         center = width * (width + 1) // 2 - 1
-        circuit.swap_nodes(0, center - width)
-        circuit.swap_nodes(1, center + width + 1)
-    else:
-        bellow_center = (width + 1) * (width + 1) // 2 - 1
-        circuit.swap_nodes(0, bellow_center - 1)
-        circuit.swap_nodes(1, bellow_center - width + 1)
-    return circuit
+        return [(0, center - width), (1, center + width + 1)]
+    bellow_center = (width + 1) * (width + 1) // 2 - 1
+    return [(0, bellow_center - 1), (1, bellow_center - width + 1)]
+
+
+def get_label(node, node1, node2):
+    """
+    Returns the label of `node` once the terminals `node1` and `node2` are swapped into 0 and 1
+    (as `circuit.swap_nodes(0, node1)` then `circuit.swap_nodes(1, node1 if node2 == 0 else
+    node2)`)
+    :param node:
+    :param node1:
+    :param node2:
+    :return:
+    """
+    second = node1 if node2 == 0 else node2
+    for swapped1, swapped2 in ((0, node1), (1, second)):
+        if node == swapped1:
+            node = swapped2
+        elif node == swapped2:
+            node = swapped1
+    return node
+
+
+def get_swapped_nodes(size, swaps):
+    """
+    Returns the list of the new numbers of the nodes `0, ..., size - 1` after `swap_nodes` was
+    called with each pair of nodes of `swaps`
+    :param size:
+    :param swaps:
+    :return:
+    """
+    # The original node of each new number
+    originals = list(range(size))
+    for node1, node2 in swaps:
+        originals[node1], originals[node2] = originals[node2], originals[node1]
+    nodes = [0] * size
+    for node, original in enumerate(originals):
+        nodes[original] = node
+    return nodes
@@ -0,0 +1,149 @@
+# -*- coding: utf8 -*-
+
+"""
+This module estimates the resistance of the infinite grid from a sequence of finite grids.
+The resistance of the knight grid of width `N` differs from the limit by the boundary effects,
+which decay as a power series in 1/N: R(N) = R + a2/N² + a3/N³ + ...
+(the odd powers come from the N×(N+1) shape of the grid and the position of the terminals).
+
+The grids are solved one after the other, with growing widths, and each new value refines a
+Richardson extrapolation which eliminates one more term of the series. The differences with the
+previous extrapolations estimate the error, so the sequence stops as soon as the requested
+tolerance is reached.
+"""
+from fractions import Fraction
+
+from resistor_grid import laplacian
+from resistor_grid.circuit import create_knight_grid
+
+
+def to_fraction(value):
+    """
+    Returns `value` as a `Fraction` (floats are converted exactly)
+    :param value:
+    :return:
+    """
+    return value if isinstance(value, Fraction) else Fraction(value)
+
+
+def richardson(points, exponents):
+    """
+    Returns the limit `R` of the sequence given by `points`, a list of `(size, value)` tuples,
+    assuming that value = R + sum(a_e / size^e for e in exponents).
+    There must be exactly `len(exponents) + 1` points. The system is solved with fractions to
+    avoid the cancellations of the floating point extrapolation: the result is a `Fraction` if
+    all the values are exact, a float otherwise.
+    :param points:
+    :param exponents:
+    :return:
+    """
+    count = len(points)
+    if count != len(exponents) + 1:
+        raise Exception(u"Richardson extrapolation requires one point per unknown")
+
+    rows = [[Fraction(1)] + [Fraction(1, size ** exponent) for exponent in exponents] +
+            [to_fraction(value)] for size, value in points]
+    for k in range(count):
+        pivot_line = next((i for i in range(k, count) if rows[i][k] != 0), None)
+        if pivot_line is None:
+            raise Exception(u"The sizes of the points must be distinct")
+        rows[k], rows[pivot_line] = rows[pivot_line], rows[k]
+        pivot_row = rows[k]
+        for i in range(count):
+            if i != k and rows[i][k] != 0:
+                factor = rows[i][k] / pivot_row[k]
+                rows[i] = [value - factor * pivot_value
+                           for value, pivot_value in zip(rows[i], pivot_row)]
+    limit = rows[0][count] / rows[0][0]
+
+    if all(isinstance(value, (int, Fraction)) for _, value in points):
+        return limit
+    return float(limit)
+
+
+def aitken(values):
+    """
+    Returns the Aitken Δ² extrapolation of the last three `values` of a sequence
+    (for a geometric convergence, when the sizes of the grids are not known)
+    :param values:
+    :return:
+    """
+    if len(values) < 3:
+        raise Exception(u"Aitken extrapolation requires three values")
+
+    value0, value1, value2 = values[-3:]
+    denominator = value2 - 2 * value1 + value0
+    if denominator == 0:
+        return value2
+    return value2 - (value2 - value1) ** 2 / denominator
+
+
+class Extrapolation(object):
+    """
+    This class accumulates the resistances of growing grids and extrapolates their limit.
+    The `value` is the Richardson extrapolation of the last `terms + 1` resistances (fewer
+    while the sequence is shorter). The `error` is its largest distance to the extrapolation with
+    one term less and to the extrapolation before the last resistance was added.
+    """
+    def __init__(self, terms=8, first_exponent=2):
+        """
+        Creates an empty extrapolation eliminating up to `terms` terms of the series, starting at
+        1/size^`first_exponent`
+        :param terms:
+        :param first_exponent:
+        """
+        self.terms = terms
+        self.first_exponent = first_exponent
+        self.sizes = []
+        self.values = []
+        self.value = None
+        self.error = None
+
+    def add(self, size, value):
+        """
+        Adds the resistance `value` of the grid of size `size` and updates the extrapolation
+        :param size:
+        :param value:
+        :return:
+        """
+        self.sizes.append(size)
+        self.values.append(value)
+        points = list(zip(self.sizes, self.values))
+        terms = min(self.terms, len(points) - 1)
+
+        previous = self.value if self.value is not None else value
+        self.value = value
+        self.error = abs(value - previous)
+        if terms > 0:
+            exponents = range(self.first_exponent, self.first_exponent + terms)
+            self.value = richardson(points[-terms - 1:], exponents)
+            fewer_terms = richardson(points[-terms:], exponents[:-1])
+            self.error = max(abs(self.value - previous), abs(self.value - fewer_terms))
+
+    def __str__(self):
+        return u"{} ± {:.1e}".format(float(self.value), float(self.error))
+
+
+def extrapolate_resistance(tolerance=1e-10, create_circuit=create_knight_grid, start=4, step=2,
+                           max_size=40, terms=8, compute_resistance=laplacian.compute_resistance):
+    """
+    Solves the circuits `create_circuit(size)` for size = start, start + step, ... and returns the
+    `Extrapolation` of their resistances between the nodes 0 and 1 once its error is below
+    `tolerance` (or when `max_size` is reached).
+    The default step keeps the parity of the knight grids: the position of the terminals depends
+    on it, so the odd and even widths are two different sequences.
+    :param tolerance:
+    :param create_circuit:
+    :param start:
+    :param step:
+    :param max_size:
+    :param terms:
+    :param compute_resistance:
+    :return:
+    """
+    extrapolation = Extrapolation(terms)
+    for size in range(start, max_size + 1, step):
+        extrapolation.add(size, compute_resistance(create_circuit(size, open_value=None)))
+        if len(extrapolation.sizes) > 2 and extrapolation.error < tolerance:
+            break
+    return extrapolation
@@ -0,0 +1,208 @@
+# -*- coding: utf8 -*-
+
+"""
+This module reports the progress of long computations (such as the Bareiss elimination).
+A `ProgressMonitor` builds a `PivotReport` after each pivot step and passes it to callbacks:
+any callable, a `LoggingSink` or a `JsonLinesSink`.
+"""
+import json
+import logging
+import time
+
+from resistor_grid.polynomial import Polynomial
+
+LOGGER = logging.getLogger(u"resistor_grid")
+
+# The number of measures of the coefficients during an elimination, by default
+MEASURE_COUNT = 16
+
+
+class PivotReport(object):
+    """
+    This class represents the measures taken after a pivot step.
+    """
+    def __init__(self, step, steps, elapsed, step_duration, multiplies, divides,
+                 max_bit_length=None, max_degree=None, eta=None):
+        self.step = step
+        self.steps = steps
+        self.elapsed = elapsed
+        self.step_duration = step_duration
+        self.multiplies = multiplies
+        self.divides = divides
+        self.max_bit_length = max_bit_length
+        self.max_degree = max_degree
+        self.eta = eta
+
+    def to_dict(self):
+        """
+        Returns the report as a dictionary
+        :return:
+        """
+        return {
+            u"step": self.step,
+            u"steps": self.steps,
+            u"elapsed": self.elapsed,
+            u"step_duration": self.step_duration,
+            u"multiplies": self.multiplies,
+            u"divides": self.divides,
+            u"max_bit_length": self.max_bit_length,
+            u"max_degree": self.max_degree,
+            u"eta": self.eta,
+        }
+
+
+def measure_value(value):
+    """
+    Returns the tuple `(bit_length, degree)` of a coefficient: the maximum bit length of its
+    integer coefficients and its degree (0 for a number)
+    :param value:
+    :return:
+    """
+    if isinstance(value, Polynomial):
+        bit_length = 0
+        for coefficient in value.coefficients:
+            if isinstance(coefficient, int):
+                bit_length = max(bit_length, abs(coefficient).bit_length())
+        return bit_length, value.deg()
+    if isinstance(value, int):
+        return abs(value).bit_length(), 0
+    return 0, 0
+
+
+def measure_rows(rows):
+    """
+    Returns the tuple `(max_bit_length, max_degree)` over all the values of `rows`, an iterable of
+    rows (lists or dicts of values)
+    :param rows:
+    :return:
+    """
+    max_bit_length = 0
+    max_degree = -1
+    for row in rows:
+        for value in (row.values() if isinstance(row, dict) else row):
+            bit_length, degree = measure_value(value)
+            max_bit_length = max(max_bit_length, bit_length)
+            max_degree = max(max_degree, degree)
+    return max_bit_length, max_degree
+
+
+class ProgressMonitor(object):
+    """
+    This class measures the progress of an elimination and reports it to `callbacks`.
+    The coefficients are measured (bit length and degree, which requires to scan the remaining
+    rows) every `measure_interval` steps, never if it is None, or `MEASURE_COUNT` times over the
+    elimination if it is "auto".
+    """
+    def __init__(self, callbacks, measure_interval=u"auto"):
+        self.callbacks = list(callbacks)
+        self.measure_interval = measure_interval
+        self.start_time = None
+        self.last_time = None
+        self.work_done = 0
+
+    def start(self):
+        """
+        Starts (or restarts) the timer
+        :return:
+        """
+        self.start_time = time.time()
+        self.last_time = self.start_time
+        self.work_done = 0
+
+    def on_step(self, step, steps, multiplies, divides, rows=None, remaining_work=None):
+        """
+        Reports the pivot step `step` (out of `steps`) which did `multiplies` multiplications and
+        `divides` divisions. `rows` are the remaining rows, to measure. The ETA is extrapolated
+        from the work done so far (the number of multiplications) and `remaining_work`, or from
+        the number of steps.
+        :param step:
+        :param steps:
+        :param multiplies:
+        :param divides:
+        :param rows:
+        :param remaining_work:
+        :return:
+        """
+        if self.start_time is None:
+            self.start()
+        now = time.time()
+        elapsed = now - self.start_time
+        step_duration = now - self.last_time
+        self.last_time = now
+        self.work_done += multiplies
+
+        if remaining_work is not None and self.work_done > 0:
+            eta = elapsed * remaining_work / self.work_done
+        else:
+            eta = elapsed * (steps - step - 1) / (step + 1)
+
+        max_bit_length = None
+        max_degree = None
+        interval = self.measure_interval
+        if interval == u"auto":
+            interval = max(1, steps // MEASURE_COUNT)
+        if rows is not None and interval is not None and step % interval == 0:
+            max_bit_length, max_degree = measure_rows(rows)
+
+        report = PivotReport(step, steps, elapsed, step_duration, multiplies, divides,
+                             max_bit_length, max_degree, eta)
+        for callback in self.callbacks:
+            callback(report)
+
+
+class LoggingSink(object):
+    """
+    This class sends the reports to a logger
+    """
+    def __init__(self, logger=LOGGER, level=logging.INFO):
+        self.logger = logger
+        self.level = level
+
+    def __call__(self, report):
+        self.logger.log(
+            self.level,
+            u"step %d/%d: %.3fs (elapsed %.1fs, ETA %.1fs), %d multiplies, %d divides, "
+            u"max bit length %s, max degree %s",
+            report.step + 1, report.steps, report.step_duration, report.elapsed, report.eta,
+            report.multiplies, report.divides, report.max_bit_length, report.max_degree)
+
+
+class JsonLinesSink(object):
+    """
+    This class writes the reports to `stream` as JSON, one report per line
+    """
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __call__(self, report):
+        self.stream.write(json.dumps(report.to_dict(), sort_keys=True) + u"\n")
+        self.stream.flush()
+
+
+def create_monitor(log_progress=False, progress=None):
+    """
+    Returns the `ProgressMonitor` for the `log_progress` and `progress` parameters of the
+    computations, or None if the progress is not observed.
+    `progress` can be a callback, a list of callbacks or a `ProgressMonitor`.
+    :param log_progress:
+    :param progress:
+    :return:
+    """
+    if isinstance(progress, ProgressMonitor):
+        if log_progress:
+            # The monitor of the caller is left unchanged
+            return ProgressMonitor(progress.callbacks + [LoggingSink()],
+                                   progress.measure_interval)
+        return progress
+
+    if progress is None:
+        callbacks = []
+    elif callable(progress):
+        callbacks = [progress]
+    else:
+        callbacks = list(progress)
+    if log_progress:
+        callbacks.append(LoggingSink())
+    if not callbacks:
+        return None
+    return ProgressMonitor(callbacks)
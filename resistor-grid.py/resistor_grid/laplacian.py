@@ -0,0 +1,246 @@
+# -*- coding: utf8 -*-
+
+"""
+This module computes equivalent resistances with the nodal analysis of a circuit.
+It uses the weighted Laplacian of the circuit (one row and column per node) where the weights
+are the conductances. The pairs of nodes without resistor are simply left out.
+
+The polynomial resistors of positive degree (such as the `x` of `create_grid`) are evaluated at
+the limit where `x` tends toward infinity: they are open circuits and are left out as well. This
+gives the same value as the ratio of the leading coefficients of the mesh determinants without
+computing any polynomial.
+"""
+from fractions import Fraction
+
+from resistor_grid.polynomial import Polynomial
+
+
+def get_conductance(value, exact=True):
+    """
+    Returns the conductance of a resistor of value `value`, or 0 if there is no resistor.
+    Integer resistances give exact `Fraction` conductances when `exact` is true.
+    A polynomial resistance is evaluated when `x` tends toward infinity.
+    :param value:
+    :param exact:
+    :return:
+    """
+    if value is None:
+        return 0
+
+    if isinstance(value, Polynomial):
+        if value.deg() > 0:
+            return 0
+        value = 0 if value.deg() < 0 else value.coefficients[0]
+
+    if value == 0:
+        raise Exception(u"Short circuits are not supported")
+
+    if not exact:
+        return 1.0 / value
+    if isinstance(value, int):
+        return Fraction(1, value)
+    return 1 / value
+
+
+def get_laplacian(circuit, exact=True):
+    """
+    Returns the Laplacian of the circuit as a list of sparse rows: `rows[i][j]` is the
+    coefficient at line `i` and column `j`. Missing entries are zeros.
+    :param circuit:
+    :param exact:
+    :return:
+    """
+    rows = [{} for _ in range(circuit.size)]
+    skip_default = get_conductance(circuit.default_value, exact) == 0
+    for node1, node2, value in circuit.get_edges(skip_default):
+        conductance = get_conductance(value, exact)
+        if conductance == 0:
+            continue
+        rows[node1][node2] = rows[node1].get(node2, 0) - conductance
+        rows[node2][node1] = rows[node2].get(node1, 0) - conductance
+        rows[node1][node1] = rows[node1].get(node1, 0) + conductance
+        rows[node2][node2] = rows[node2].get(node2, 0) + conductance
+    return rows
+
+
+class LaplacianSolver(object):
+    """
+    This class factorizes the Laplacian of a circuit where the node `ground` is at potential 0.
+    The factorization (L.D.L^T, in the order of the nodes) only stores the non-zero coefficients
+    so it can then be used to solve many current distributions. The nodes which are not
+    connected to the ground are left out: their potentials are 0.
+    """
+    def __init__(self, circuit, ground=0, exact=True, rows=None):
+        """
+        Factorizes the Laplacian of `circuit`, or the symmetric matrix `rows` (sparse rows, as
+        returned by `get_laplacian`) if it is given: `circuit` is then ignored.
+        :param circuit:
+        :param ground:
+        :param exact:
+        :param rows:
+        """
+        if rows is None:
+            rows = get_laplacian(circuit, exact)
+        self.size = len(rows)
+        self.ground = ground
+        self.pivots = [None] * self.size
+        self.factors = [None] * self.size
+        self.floating = None
+        self.factorize(rows)
+
+    def factorize(self, rows):
+        """
+        Computes the factorization of the Laplacian `rows` (which is consumed)
+        :param rows:
+        :return:
+        """
+        for row in rows:
+            row.pop(self.ground, None)
+
+        for k in range(self.size):
+            if k == self.ground:
+                continue
+            row = rows[k]
+            rows[k] = None
+            pivot = row.pop(k, 0)
+            for j in row:
+                rows[j].pop(k)
+            if pivot == 0:
+                # The last node of a component which is not connected to the ground
+                if any(value != 0 for value in row.values()):
+                    raise Exception(u"Singular matrix")
+                self.factors[k] = {}
+                continue
+            factors = {j: value / pivot for j, value in row.items()}
+            for j, factor in factors.items():
+                row_j = rows[j]
+                for i, value in row.items():
+                    row_j[i] = row_j.get(i, 0) - factor * value
+            self.pivots[k] = pivot
+            self.factors[k] = factors
+
+        # The nodes of a component are eliminated into its last node (the root of the
+        # elimination tree), which has a null pivot when the component is not grounded
+        roots = list(range(self.size))
+        for k in reversed(range(self.size)):
+            if self.factors[k]:
+                roots[k] = roots[min(self.factors[k])]
+        self.floating = set(k for k in range(self.size)
+                            if roots[k] != self.ground and self.pivots[roots[k]] is None)
+
+    def solve(self, currents):
+        """
+        Returns the list of the potentials of the nodes when the currents `currents` (a list
+        indexed by node) are injected into the circuit. The ground absorbs the total current.
+        :param currents:
+        :return:
+        """
+        potentials = list(currents)
+        potentials[self.ground] = 0
+        for k in range(self.size):
+            if k != self.ground:
+                for j, factor in self.factors[k].items():
+                    potentials[j] -= factor * potentials[k]
+        for k in range(self.size):
+            if k != self.ground:
+                if self.pivots[k] is None:
+                    potentials[k] = 0
+                else:
+                    potentials[k] /= self.pivots[k]
+        for k in reversed(range(self.size)):
+            if k != self.ground:
+                for j, factor in self.factors[k].items():
+                    potentials[k] -= factor * potentials[j]
+        return potentials
+
+    def ensure_connected(self, nodes):
+        """
+        Raises an exception if one of the nodes `nodes` is not connected to the ground
+        :param nodes:
+        :return:
+        """
+        for node in nodes:
+            if node in self.floating:
+                raise Exception(u"The node {} is not connected to the ground".format(node))
+
+    def get_resistance(self, node1, node2):
+        """
+        Returns the equivalent resistance between the nodes `node1` and `node2`
+        :param node1:
+        :param node2:
+        :return:
+        """
+        if node1 == node2:
+            raise Exception(u"Cannot get resistance for same node")
+        self.ensure_connected((node1, node2))
+
+        currents = [0] * self.size
+        currents[node1] = 1
+        currents[node2] = -1
+        potentials = self.solve(currents)
+        return potentials[node1] - potentials[node2]
+
+    def get_resistances(self, pairs):
+        """
+        Returns the list of the equivalent resistances between the nodes of each pair of `pairs`.
+        The potentials when a unit current is injected into each node (and absorbed by the ground)
+        are computed once per distinct node: R(i, j) = V_i(i) + V_j(j) - 2.V_i(j).
+        :param pairs:
+        :return:
+        """
+        columns = {}
+        for pair in pairs:
+            self.ensure_connected(pair)
+            for node in pair:
+                if node == self.ground:
+                    columns[node] = [0] * self.size
+                elif node not in columns:
+                    currents = [0] * self.size
+                    currents[node] = 1
+                    columns[node] = self.solve(currents)
+        resistances = []
+        for node1, node2 in pairs:
+            if node1 == node2:
+                raise Exception(u"Cannot get resistance for same node")
+            resistances.append(
+                columns[node1][node1] + columns[node2][node2] - 2 * columns[node1][node2])
+        return resistances
+
+
+def compute_resistance(circuit, node1=0, node2=1, exact=True):
+    """
+    Returns the equivalent resistance between the nodes `node1` and `node2` of `circuit`
+    :param circuit:
+    :param node1:
+    :param node2:
+    :param exact:
+    :return:
+    """
+    return LaplacianSolver(circuit, ground=node2, exact=exact).get_resistance(node1, node2)
+
+
+def compute_resistances(circuit, pairs, exact=True):
+    """
+    Returns the list of the equivalent resistances between the nodes of each pair of `pairs` (a
+    list of tuples `(node1, node2)`) with a single factorization of the Laplacian of `circuit`
+    :param circuit:
+    :param pairs:
+    :param exact:
+    :return:
+    """
+    ground = get_most_frequent_node(pairs)
+    return LaplacianSolver(circuit, ground=ground, exact=exact).get_resistances(pairs)
+
+
+def get_most_frequent_node(pairs):
+    """
+    Returns the node appearing in most of the pairs of `pairs` (0 if there is no pair). It is
+    used as the ground: its potential is known without a solve.
+    :param pairs:
+    :return:
+    """
+    counts = {}
+    for pair in pairs:
+        for node in pair:
+            counts[node] = counts.get(node, 0) + 1
+    return max(counts, key=counts.get) if counts else 0
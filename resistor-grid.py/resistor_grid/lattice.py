@@ -0,0 +1,162 @@
+# -*- coding: utf8 -*-
+
+"""
+This module computes the exact resistance between two nodes of the infinite square grid of 1 Ohm
+resistors, from the lattice Green's function.
+The resistance between the origin and the node at the offset (m, n) is `a + b/π` with `a` and `b`
+rational. It is symmetric (R(m, n) = R(n, m) = R(|m|, |n|)) and harmonic outside of the origin:
+4.R(m, n) = R(m - 1, n) + R(m + 1, n) + R(m, n - 1) + R(m, n + 1)
+With the diagonal values R(n, n) = 2/π.(1 + 1/3 + ... + 1/(2n - 1)), this recurrence gives all
+the other values, line by line. The rationals are exact, so the recurrence is stable.
+They grow quickly with the offset and `a` and `b/π` nearly cancel each other: the floating point
+values are computed with enough digits of π.
+"""
+from fractions import Fraction
+
+
+def arctan_inverse(value, one):
+    """
+    Returns arctan(1/`value`).`one` as an integer (`one` is a power of 10)
+    :param value:
+    :param one:
+    :return:
+    """
+    square = value * value
+    term = one // value
+    result = term
+    k = 1
+    while term:
+        term //= -square
+        result += term // (2 * k + 1)
+        k += 1
+    return result
+
+
+def get_pi(digits):
+    """
+    Returns a fraction approximating π with `digits` decimal digits (Machin's formula)
+    :param digits:
+    :return:
+    """
+    guard = 10
+    one = 10 ** (digits + guard)
+    return Fraction(4 * (4 * arctan_inverse(5, one) - arctan_inverse(239, one)), one)
+
+
+class LatticeResistances(object):
+    """
+    This class holds the table of the resistances of the infinite grid.
+    `lines[m][n]` (for 0 <= n <= m) is the tuple `(a, b)` of the resistance `a + b/π` between the
+    origin and the offset (m, n). The table grows when a larger offset is requested.
+    """
+    def __init__(self):
+        self.lines = [[(Fraction(0), Fraction(0))]]
+        self.diagonal = Fraction(0)  # 1 + 1/3 + ... + 1/(2m - 1) for the last line m
+        self.pi = None  # (digits, approximation of π)
+
+    def extend(self, radius):
+        """
+        Computes the lines of the table until the line `radius` (included)
+        :param radius:
+        :return:
+        """
+        while len(self.lines) <= radius:
+            self.add_line()
+
+    def add_line(self):
+        """
+        Computes the next line of the table
+        :return:
+        """
+        lines = self.lines
+        m = len(lines) - 1
+        line = lines[m]
+        new_line = []
+        for n in range(m):
+            # At (m, n): R(m + 1, n) = 4.R(m, n) - R(m - 1, n) - R(m, n - 1) - R(m, n + 1)
+            # where R(m, -1) is R(m, 1)
+            below = line[n - 1] if n > 0 else line[1]
+            previous = lines[m - 1][n]
+            new_line.append(tuple(4 * value - value_previous - value_below - value_above
+                                  for value, value_previous, value_below, value_above
+                                  in zip(line[n], previous, below, line[n + 1])))
+        if m == 0:
+            new_line.append((Fraction(1, 2), Fraction(0)))
+        else:
+            # At (m, m): 4.R(m, m) = 2.R(m + 1, m) + 2.R(m, m - 1)
+            new_line.append(tuple(2 * value - value_below
+                                  for value, value_below in zip(line[m], line[m - 1])))
+        self.diagonal += Fraction(1, 2 * m + 1)
+        new_line.append((Fraction(0), 2 * self.diagonal))
+        lines.append(new_line)
+
+    def get(self, dx, dy):
+        """
+        Returns the tuple `(a, b)` of the resistance `a + b/π` between the origin and the node at
+        the offset (`dx`, `dy`)
+        :param dx:
+        :param dy:
+        :return:
+        """
+        m = max(abs(dx), abs(dy))
+        n = min(abs(dx), abs(dy))
+        self.extend(m)
+        return self.lines[m][n]
+
+    def get_resistance(self, dx, dy):
+        """
+        Returns the resistance between the origin and the node at the offset (`dx`, `dy`) as a
+        float
+        :param dx:
+        :param dy:
+        :return:
+        """
+        rational, inverse_pi = self.get(dx, dy)
+        if inverse_pi == 0:
+            return float(rational)
+        # The digits lost in the cancellation, and those of the float
+        size = max(abs(rational), abs(inverse_pi))
+        digits = len(str(size.numerator // size.denominator)) + 20
+        if self.pi is None or self.pi[0] < digits:
+            self.pi = (digits, get_pi(digits))
+        return float(rational + inverse_pi / self.pi[1])
+
+
+RESISTANCES = LatticeResistances()
+
+
+def get_exact_resistance(dx, dy):
+    """
+    Returns the tuple `(a, b)` of the resistance `a + b/π` of the infinite grid between two nodes
+    at the offset (`dx`, `dy`) (from the shared table `RESISTANCES`)
+    :param dx:
+    :param dy:
+    :return:
+    """
+    return RESISTANCES.get(dx, dy)
+
+
+def compute_resistance(dx, dy):
+    """
+    Returns the resistance of the infinite grid between two nodes at the offset (`dx`, `dy`)
+    (from the shared table `RESISTANCES`)
+    :param dx:
+    :param dy:
+    :return:
+    """
+    return RESISTANCES.get_resistance(dx, dy)
+
+
+def format_resistance(value):
+    """
+    Returns the tuple `(a, b)` as the string "a + b/π"
+    :param value:
+    :return:
+    """
+    rational, inverse_pi = value
+    if inverse_pi == 0:
+        return u"{}".format(rational)
+    if rational == 0:
+        return u"{}/π".format(inverse_pi)
+    sign = u"-" if inverse_pi < 0 else u"+"
+    return u"{} {} {}/π".format(rational, sign, abs(inverse_pi))
@@ -2,10 +2,31 @@
 
 """
 This is the main module. It computes the equivalent resistance of a resistor grid.
+
+Usage: resistor-grid [--width 3] [--height 4 --terminals 0,2 2,1] [--sweep 2:10]
+                     [--engine laplacian] [--format text] [--cache DIRECTORY]
+See `resistor-grid --help` for all the options.
 """
-from resistor_grid.circuit import Circuit, create_knight_grid
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from fractions import Fraction
+import json
+import logging
+import sys
+import time
+
+from resistor_grid import laplacian, modular, numeric, reduction
+from resistor_grid.cache import ResultCache, get_circuit_key
+from resistor_grid.circuit import Circuit, create_grid, create_knight_grid, get_label
 from resistor_grid.polynomial import Polynomial
 
+LOGGER = logging.getLogger(u"resistor_grid")
+
+ENGINES = (u"laplacian", u"reduction", u"modular", u"numeric", u"determinant")
+FORMATS = (u"text", u"json", u"csv")
+FIELDS = (u"width", u"height", u"node1", u"node2", u"engine", u"resistance", u"value", u"seconds")
+
 
 def generate_polygon(size):
     """
@@ -35,25 +56,232 @@ def divide_polynomials_at_infinity(pol1, pol2):
 
     val1 = 0 if deg1 < 0 else pol1.coefficients[deg1]
     val2 = 0 if deg2 < 0 else pol2.coefficients[deg2]
-    print(val1, u"/", val2)
+    LOGGER.info(u"%s / %s", val1, val2)
+    if isinstance(val1, int) and isinstance(val2, int):
+        return Fraction(val1, val2)
     return float(val1) / float(val2)
 
-N = 3
 
-CIRCUIT = create_knight_grid(N)
+def compute_mesh_resistance(circuit, node1=0, node2=1, log_progress=False, workers=1,
+                            executor=None):
+    """
+    Returns the equivalent resistance between `node1` and `node2` with the determinants of the
+    mesh matrix of the circuit (the nodes are swapped into 0 and 1 in a copy of the circuit)
+    :param circuit:
+    :param node1:
+    :param node2:
+    :param log_progress:
+    :param workers:
+    :param executor:
+    :return:
+    """
+    swapped = type(circuit)(circuit.size, circuit.default_value)
+    for edge_node1, edge_node2, value in circuit.get_edges(skip_default=True):
+        swapped.set(get_label(edge_node1, node1, node2), get_label(edge_node2, node1, node2),
+                    value)
+
+    circuit_mat = swapped.get_matrix(null_value=Polynomial([0]), neutral_value=Polynomial([1]))
+    size = circuit_mat.get_size()[0]
+    # The resistor matrix is `circuit_mat.sub_matrix(0, size - 1).rot_left()`: its determinant
+    # is the minor, with the sign of the rotation of its `size - 1` columns
+    circuit_value, minor_value = circuit_mat.compute_det_and_minor(
+        0, size - 1, null_value=Polynomial([0]), neutral_value=Polynomial([1]),
+        log_progress=log_progress, workers=workers, executor=executor)
+    resistor_value = minor_value if size % 2 == 0 else -minor_value
+    return divide_polynomials_at_infinity(resistor_value, circuit_value)
 
-# for x in range(N * (N + 1)):
-#     for y in range(x):
-#         print x, y, CIRCUIT.get(x, y)
 
-CIRCUIT_MAT = CIRCUIT.get_matrix(null_value=Polynomial([0]), neutral_value=Polynomial([1]))
-RESISTOR_MAT = CIRCUIT_MAT.sub_matrix(0, CIRCUIT_MAT.get_size()[0] - 1).rot_left()
+def compute_resistance(circuit, node1=0, node2=1, engine=u"laplacian", log_progress=False,
+                       workers=1, executor=None):
+    """
+    Returns the equivalent resistance between `node1` and `node2` computed by the engine `engine`
+    (one of `ENGINES`)
+    :param circuit:
+    :param node1:
+    :param node2:
+    :param engine:
+    :param log_progress:
+    :param workers:
+    :param executor:
+    :return:
+    """
+    if engine == u"laplacian":
+        return laplacian.compute_resistance(circuit, node1, node2)
+    elif engine == u"reduction":
+        return reduction.compute_resistance(circuit, node1, node2)
+    elif engine == u"modular":
+        return modular.compute_resistance(circuit, node1, node2)
+    elif engine == u"numeric":
+        return numeric.compute_resistance(circuit, node1, node2)
+    elif engine == u"determinant":
+        return compute_mesh_resistance(circuit, node1, node2, log_progress, workers, executor)
+    raise Exception(u"Unknown engine: {}".format(engine))
+
+
+def parse_range(value):
+    """
+    Parses a range `START:STOP[:STEP]` (STOP is included) and returns it as a `range`
+    :param value:
+    :return:
+    """
+    bounds = [int(bound) for bound in value.split(u":")]
+    if len(bounds) == 1:
+        bounds.append(bounds[0])
+    if len(bounds) == 2:
+        bounds.append(1)
+    if len(bounds) != 3 or bounds[2] == 0:
+        raise argparse.ArgumentTypeError(u"Invalid range: {}".format(value))
+    result = range(bounds[0], bounds[1] + 1, bounds[2])
+    if len(result) == 0:
+        raise argparse.ArgumentTypeError(u"Empty range: {}".format(value))
+    return result
+
+
+def parse_position(value):
+    """
+    Parses a grid position `X,Y` and returns it as a tuple
+    :param value:
+    :return:
+    """
+    try:
+        column, line = (int(coordinate) for coordinate in value.split(u","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(u"Invalid position: {}".format(value))
+    return column, line
+
+
+def iterate_problems(args):
+    """
+    Yields the tuples `(width, height, circuit, node1, node2)` described by the command line
+    arguments: knight grids for each width of the sweep, or a single grid
+    :param args:
+    :return:
+    """
+    widths = args.sweep if args.sweep is not None else [args.width]
+    for width in widths:
+        if args.height is None:
+            yield width, width + 1, create_knight_grid(width), 0, 1
+        else:
+            if args.terminals is None:
+                raise Exception(u"--terminals is required with --height")
+            nodes = [line * width + column for column, line in args.terminals]
+            yield width, args.height, create_grid(width, args.height), nodes[0], nodes[1]
+
+
+class ResultWriter(object):
+    """
+    This class streams the results to `stream` in the format `output_format`
+    """
+    def __init__(self, stream, output_format):
+        self.stream = stream
+        self.output_format = output_format
+        self.csv_writer = None
+        if output_format == u"csv":
+            self.csv_writer = csv.DictWriter(stream, FIELDS)
+            self.csv_writer.writeheader()
+
+    def write(self, result):
+        """
+        Writes the result (a dict with the keys `FIELDS`)
+        :param result:
+        :return:
+        """
+        if self.output_format == u"json":
+            self.stream.write(json.dumps(result, sort_keys=True) + u"\n")
+        elif self.output_format == u"csv":
+            self.csv_writer.writerow(result)
+        else:
+            self.stream.write(u"{width}x{height} grid, nodes {node1} and {node2} ({engine}): "
+                              u"{resistance} = {value} ({seconds:.3f}s)\n".format(**result))
+        self.stream.flush()
+
+
+def create_parser():
+    """
+    Returns the parser of the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        prog=u"resistor-grid",
+        description=u"Computes the equivalent resistance between two nodes of a grid of 1 Ohm "
+                    u"resistors. Without --height, the grid is the knight grid of width "
+                    u"--width (--width + 1 lines) with the nodes a knight's move away.")
+    parser.add_argument(u"--width", type=int, default=3, help=u"width of the grid (default: 3)")
+    parser.add_argument(u"--height", type=int, help=u"height of the grid")
+    parser.add_argument(u"--terminals", type=parse_position, nargs=2, metavar=u"X,Y",
+                        help=u"positions of the two nodes (with --height)")
+    parser.add_argument(u"--sweep", type=parse_range, metavar=u"START:STOP[:STEP]",
+                        help=u"run all the widths of this range (STOP included)")
+    parser.add_argument(u"--engine", choices=ENGINES, default=u"laplacian",
+                        help=u"solver (default: laplacian)")
+    parser.add_argument(u"--format", choices=FORMATS, default=u"text", dest=u"output_format",
+                        help=u"output format (default: text)")
+    parser.add_argument(u"--workers", type=int, default=1,
+                        help=u"worker processes of the determinant engine (default: 1)")
+    parser.add_argument(u"--cache", metavar=u"DIRECTORY",
+                        help=u"reuse and store the results in this directory")
+    parser.add_argument(u"--cache-size", type=int, default=256, metavar=u"MB",
+                        help=u"maximum size of the cache directory (default: 256)")
+    parser.add_argument(u"--verbose", action=u"store_true", help=u"log the progress")
+    return parser
+
+
+def main(argv=None):
+    """
+    The entry point of the command line interface
+    :param argv:
+    :return:
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    if args.height is not None:
+        if args.terminals is None:
+            parser.error(u"--terminals is required with --height")
+        widths = args.sweep if args.sweep is not None else [args.width]
+        for column, line in args.terminals:
+            if not (0 <= column < min(widths) and 0 <= line < args.height):
+                parser.error(u"The terminal {},{} is outside the grid".format(column, line))
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format=u"%(message)s")
 
-# print CIRCUIT_MAT
+    writer = ResultWriter(sys.stdout, args.output_format)
+    cache = None
+    if args.cache is not None:
+        cache = ResultCache(args.cache, args.cache_size * 1024 * 1024)
+    executor = None
+    if args.workers > 1:
+        # The same worker processes are used for the whole sweep
+        executor = ProcessPoolExecutor(max_workers=args.workers)
+    try:
+        for width, height, circuit, node1, node2 in iterate_problems(args):
+            start = time.time()
+            resistance = None
+            if cache is not None:
+                key = get_circuit_key(circuit, node1, node2, namespace=args.engine)
+                entry = cache.get(key)
+                if entry is not None:
+                    resistance = entry.get(u"resistance")
+            if resistance is None:
+                resistance = compute_resistance(circuit, node1, node2, args.engine,
+                                                args.verbose, args.workers, executor)
+                if cache is not None:
+                    cache.update(key, resistance=resistance)
+            writer.write({
+                u"width": width,
+                u"height": height,
+                u"node1": node1,
+                u"node2": node2,
+                u"engine": args.engine,
+                u"resistance": str(resistance),
+                u"value": float(resistance),
+                u"seconds": time.time() - start,
+            })
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return 0
 
-CIRCUIT_VALUE = CIRCUIT_MAT.compute_det(log_progress=True)
-RESISTOR_VALUE = RESISTOR_MAT.compute_det(log_progress=True)
 
-# print RESISTOR_VALUE, u"/", CIRCUIT_VALUE
+if __name__ == u"__main__":
+    sys.exit(main())
 
-print(divide_polynomials_at_infinity(RESISTOR_VALUE, CIRCUIT_VALUE))
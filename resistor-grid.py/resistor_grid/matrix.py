@@ -3,22 +3,322 @@
 """
 This module provides utilities to handle matrices.
 """
+from concurrent.futures import ProcessPoolExecutor
+import os
+import pickle
+import zlib
 
-def clone_matrix(mat):
+from resistor_grid.instrumentation import create_monitor
+
+CHECKPOINT_MAGIC = b"RGCK\x01"
+
+def zero_of(mat):
+    """
+    Returns the zero of the ring of the coefficients of the 2D array `mat`
+    :param mat:
+    :return:
+    """
+    for row in mat:
+        for value in row:
+            return value - value
+    return 0
+
+
+def permutation_parity(permutation):
+    """
+    Returns the parity (0 if even, 1 if odd) of the permutation given as a list of indices
+    :param permutation:
+    :return:
+    """
+    parity = 0
+    visited = [False] * len(permutation)
+    for start in range(len(permutation)):
+        if not visited[start]:
+            cur = start
+            while not visited[cur]:
+                visited[cur] = True
+                cur = permutation[cur]
+                parity ^= 1
+            parity ^= 1
+    return parity
+
+
+def bareiss_update(value, pivot, left, top, previous_pivot=None):
+    """
+    Returns (value * pivot - left * top) // previous_pivot, the update of a coefficient during a
+    step of the Bareiss algorithm. The coefficients providing a fused `bareiss_update` method
+    (such as polynomials) use it to avoid intermediate objects.
+    :param value:
+    :param pivot:
+    :param left:
+    :param top:
+    :param previous_pivot:
+    :return:
+    """
+    fused_update = getattr(value, u"bareiss_update", None)
+    if fused_update is not None:
+        return fused_update(pivot, left, top, previous_pivot)
+    result = value * pivot - left * top
+    if previous_pivot is not None:
+        result //= previous_pivot
+    return result
+
+
+def eliminate_rows(pivot_row, rows, previous_pivot=None):
+    """
+    Applies a step of the Bareiss algorithm to `rows`, all the rows (and `pivot_row`) start at the
+    pivot column. Returns the updated rows, without their first (eliminated) coefficient.
+    This is the unit of work sent to the worker processes.
+    :param pivot_row:
+    :param rows:
+    :param previous_pivot:
+    :return:
+    """
+    pivot = pivot_row[0]
+    width = len(pivot_row)
+    updated_rows = []
+    for row in rows:
+        left = row[0]
+        updated_rows.append([bareiss_update(row[k], pivot, left, pivot_row[k], previous_pivot)
+                             for k in range(1, width)])
+    return updated_rows
+
+
+class Checkpoint(object):
+    """
+    This class represents the checkpoints file of a long elimination.
+    The working matrix and the index of the next step are saved every `interval` steps in a
+    compressed binary file, written to a temporary file then atomically renamed so the file is
+    always consistent. `kind`, `line` and `column` describe what the elimination computes (see
+    `resume_det`).
+    """
+    def __init__(self, path, interval=1, kind=u"det", line=None, column=None):
+        self.path = path
+        self.interval = interval
+        self.kind = kind
+        self.line = line
+        self.column = column
+
+    def save(self, mat, step, steps):
+        """
+        Saves the working matrix `mat` before the step `step` (out of `steps`)
+        :param mat:
+        :param step:
+        :param steps:
+        :return:
+        """
+        state = {
+            u"kind": self.kind,
+            u"line": self.line,
+            u"column": self.column,
+            u"interval": self.interval,
+            u"step": step,
+            u"steps": steps,
+            u"mat": mat,
+        }
+        data = CHECKPOINT_MAGIC + zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+        temporary_path = self.path + u".tmp"
+        with open(temporary_path, u"wb") as checkpoint_file:
+            checkpoint_file.write(data)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temporary_path, self.path)
+
+    @staticmethod
+    def load(path):
+        """
+        Returns the tuple `(checkpoint, state)` read from the file `path`
+        :param path:
+        :return:
+        """
+        with open(path, u"rb") as checkpoint_file:
+            data = checkpoint_file.read()
+        if not data.startswith(CHECKPOINT_MAGIC):
+            raise Exception(u"Not a checkpoint file: {}".format(path))
+        state = pickle.loads(zlib.decompress(data[len(CHECKPOINT_MAGIC):]))
+        checkpoint = Checkpoint(path, state[u"interval"], state[u"kind"], state[u"line"],
+                                state[u"column"])
+        return checkpoint, state
+
+
+def eliminate(mat, steps, monitor=None, workers=1, executor=None, start=0, checkpoint=None):
+    """
+    Applies the steps `start` to `steps - 1` of the Bareiss algorithm to the 2D array `mat`
+    (in place), reporting each step to the `ProgressMonitor` `monitor` and saving the progress
+    to `checkpoint` if provided.
+    See `Matrix.compute_det` for `workers` and `executor`.
+    :param mat:
+    :param steps:
+    :param monitor:
+    :param workers:
+    :param executor:
+    :param start:
+    :param checkpoint:
+    :return:
+    """
+    if workers > 1 and executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as new_executor:
+            return eliminate(mat, steps, monitor, workers, new_executor, start, checkpoint)
+
+    lines = len(mat)
+    width = len(mat[0]) if lines > 0 else 0
+    if monitor is not None:
+        monitor.start()
+    for i in range(start, steps):
+        previous_pivot = mat[i - 1][i - 1] if i > 0 else None
+        if workers > 1 and lines - i - 1 >= 2 * workers:
+            # Only the blocks sent to the worker processes are sliced
+            pivot_row = mat[i][i:]
+            rows = [mat[j][i:] for j in range(i + 1, lines)]
+            block_size = -(-len(rows) // workers)
+            futures = [
+                executor.submit(eliminate_rows, pivot_row, rows[first:first + block_size],
+                                previous_pivot)
+                for first in range(0, len(rows), block_size)
+            ]
+            updated_rows = [row for future in futures for row in future.result()]
+            for j, row in enumerate(updated_rows, i + 1):
+                mat[j][i + 1:] = row
+        else:
+            pivot = mat[i][i]
+            pivot_row = mat[i]
+            for j in range(i + 1, lines):
+                row = mat[j]
+                left = row[i]
+                for k in range(i + 1, width):
+                    row[k] = bareiss_update(row[k], pivot, left, pivot_row[k], previous_pivot)
+        if monitor is not None:
+            updates = (lines - i - 1) * (width - i - 1)
+            monitor.on_step(
+                i, steps, 2 * updates, updates if i > 0 else 0,
+                rows=(mat[j][i + 1:] for j in range(i + 1, lines)),
+                remaining_work=sum(2 * (lines - k - 1) * (width - k - 1)
+                                   for k in range(i + 1, steps)))
+        if i > 0:
+            for j in range(lines):
+                mat[j][i - 1] = 0
+            for j in range(len(mat[i - 1])):
+                mat[i - 1][j] = 0
+        if checkpoint is not None and (i + 1) % checkpoint.interval == 0:
+            checkpoint.save(mat, i + 1, steps)
+
+
+def resume_det(path, log_progress=False, workers=1, executor=None, progress=None):
+    """
+    Resumes the elimination saved in the checkpoint file `path` (see the `checkpoint`
+    parameter of `Matrix.compute_det` and `Matrix.compute_det_and_minor`) and returns its result
+    :param path:
+    :param log_progress:
+    :param workers:
+    :param executor:
+    :param progress:
+    :return:
+    """
+    checkpoint, state = Checkpoint.load(path)
+    mat = state[u"mat"]
+    steps = state[u"steps"]
+    monitor = create_monitor(log_progress, progress)
+    eliminate(mat, steps, monitor, workers, executor, state[u"step"], checkpoint)
+    if checkpoint.kind == u"det":
+        return get_det(mat)
+    return get_det_and_minor(mat, checkpoint.line, checkpoint.column)
+
+
+def get_det(mat):
+    """
+    Returns the determinant from the 2D array `mat` eliminated by `Matrix.compute_det`
+    :param mat:
+    :return:
+    """
+    return mat[len(mat) - 1][len(mat) - 1]
+
+
+def get_det_and_minor(mat, line, column):
     """
-    Clones a 2D array
+    Returns the tuple `(det, minor)` from the 2D array `mat` eliminated by
+    `Matrix.compute_det_and_minor`
     :param mat:
+    :param line:
+    :param column:
     :return:
     """
-    return [[x for x in row] for row in mat]
+    size = len(mat)
+    det = mat[size - 1][size - 1]
+    if (size - 1 - column) % 2 == 1:
+        det = -det
+    minor = mat[size - 1][size]
+    if (line + size - 1) % 2 == 1:
+        minor = -minor
+    return det, minor
 
 
 class Matrix(object):
     """
     This class represents a 0-indexed matrix.
+
+    The coefficients are stored once, line by line, in the flat tuple `storage` (of `stride`
+    columns). The matrix is a view of this storage: its line `i` and column `j` is the
+    coefficient `storage[lines[i] * stride + columns[j]]`. `sub_matrix`, `rot_left` and
+    `permute` only build new index maps over the same storage, the coefficients are copied when
+    an elimination starts.
     """
     def __init__(self, coefficients):
-        self.coefficients = tuple(tuple(x for x in row) for row in coefficients)
+        storage = []
+        lines = 0
+        stride = None
+        for row in coefficients:
+            storage.extend(row)
+            lines += 1
+            if stride is None:
+                stride = len(storage)
+        self.storage = tuple(storage)
+        self.stride = stride or 0
+        self.lines = range(lines)
+        self.columns = range(self.stride)
+        self.cached_coefficients = None
+
+    def view(self, lines, columns):
+        """
+        Returns the matrix of the lines `lines` and columns `columns` (sequences of indices of
+        this matrix), sharing the storage of this matrix
+        :param lines:
+        :param columns:
+        :return:
+        """
+        mat = Matrix.__new__(Matrix)
+        mat.storage = self.storage
+        mat.stride = self.stride
+        mat.lines = tuple(self.lines[i] for i in lines)
+        mat.columns = tuple(self.columns[j] for j in columns)
+        mat.cached_coefficients = None
+        return mat
+
+    def get_row(self, line):
+        """
+        Returns a new list of the coefficients of the line `line`
+        :param line:
+        :return:
+        """
+        storage = self.storage
+        offset = self.lines[line] * self.stride
+        return [storage[offset + j] for j in self.columns]
+
+    def get_rows(self):
+        """
+        Returns a new 2D array (list of lists) of the coefficients
+        :return:
+        """
+        return [self.get_row(i) for i in range(len(self.lines))]
+
+    @property
+    def coefficients(self):
+        """
+        The coefficients, as a tuple of tuples (built on the first access)
+        :return:
+        """
+        if self.cached_coefficients is None:
+            self.cached_coefficients = tuple(tuple(row) for row in self.get_rows())
+        return self.cached_coefficients
 
     def __str__(self):
         return self.pretty_print()
@@ -29,7 +329,7 @@ class Matrix(object):
         :return:
         """
         formatted_lines = []
-        for line in self.coefficients:
+        for line in self.get_rows():
             formatted_items = []
             for item in line:
                 formatted_items.append(str(item).ljust(indent, " "))
@@ -43,15 +343,15 @@ class Matrix(object):
         :param column:
         :return:
         """
-        return self.coefficients[line][column]
+        return self.storage[self.lines[line] * self.stride + self.columns[column]]
 
     def get_size(self):
         """
         Returns the size of the matrix as the tuple (lines, columns)
         :return:
         """
-        lines = len(self.coefficients)
-        columns = 0 if lines == 0 else len(self.coefficients[0])
+        lines = len(self.lines)
+        columns = 0 if lines == 0 else len(self.columns)
         return lines, columns
 
     def is_square(self):
@@ -62,32 +362,190 @@ class Matrix(object):
         lines, columns = self.get_size()
         return lines == columns
 
-    def compute_det(self, log_progress=False):
+    def compute_det(self, log_progress=False, workers=1, executor=None, checkpoint_path=None,
+                    checkpoint_interval=1, progress=None):
         """
         Computes and returns the determinant of the matrix
         (Uses the Bareiss algorithm)
+
+        With `workers` > 1, the rows below the pivot are split in `workers` blocks updated in
+        parallel by worker processes (the processes of `executor` if provided, which is left
+        running so it can be reused). The workers are synchronized once per pivot.
+
+        With `checkpoint_path`, the progress is saved every `checkpoint_interval` pivots and an
+        interrupted computation can be continued with `resume_det(checkpoint_path)`.
+
+        The progress of each pivot step (see `resistor_grid.instrumentation`) is reported to
+        `progress` (a callback, a list of callbacks or a `ProgressMonitor`) and, if
+        `log_progress` is true, to the `resistor_grid` logger.
+        :param log_progress:
+        :param workers:
+        :param executor:
+        :param checkpoint_path:
+        :param checkpoint_interval:
+        :param progress:
         :return:
         """
         if not self.is_square():
             raise Exception(u"Not a square matrix")
 
-        mat = clone_matrix(self.coefficients)
+        mat = self.get_rows()
         size = self.get_size()[0]
+        if size == 0:
+            return 1
+        checkpoint = None
+        if checkpoint_path is not None:
+            checkpoint = Checkpoint(checkpoint_path, checkpoint_interval)
+        monitor = create_monitor(log_progress, progress)
+        eliminate(mat, size - 1, monitor, workers, executor, checkpoint=checkpoint)
+        return get_det(mat)
 
-        for i in range(size - 1):
-            for j in range(i + 1, size):
-                for k in range(i + 1, size):
-                    mat[j][k] = (mat[j][k] * mat[i][i]) - (mat[j][i] * mat[i][k])
-                    if i > 0:
-                        mat[j][k] //= mat[i - 1][i - 1]
-            if log_progress:
-                print(i)
-            if i > 0:
-                for j in range(size):
-                    mat[j][i - 1] = 0
-                    mat[i - 1][j] = 0
-
-        return mat[size - 1][size - 1]
+    def compute_det_and_minor(self, line, column, null_value=0, neutral_value=1,
+                              log_progress=False, workers=1, executor=None, checkpoint_path=None,
+                              checkpoint_interval=1, progress=None):
+        """
+        Computes and returns the tuple `(det, minor)` where `det` is the determinant of the matrix
+        and `minor` the determinant of `sub_matrix(line, column)`, with a single elimination.
+
+        The column `column` is moved to the end and the matrix is bordered with the column
+        vector e_line: after the Bareiss elimination, the last row holds both the determinant
+        and the determinant where the last column is replaced by e_line, which is the cofactor.
+        See `compute_det` for the other parameters.
+        :param line:
+        :param column:
+        :param null_value:
+        :param neutral_value:
+        :param log_progress:
+        :param workers:
+        :param executor:
+        :param checkpoint_path:
+        :param checkpoint_interval:
+        :param progress:
+        :return:
+        """
+        if not self.is_square():
+            raise Exception(u"Not a square matrix")
+
+        size = self.get_size()[0]
+        moved = self.view(range(size), [j for j in range(size) if j != column] + [column])
+        mat = moved.get_rows()
+        for i, bordered_row in enumerate(mat):
+            bordered_row.append(neutral_value if i == line else null_value)
+
+        checkpoint = None
+        if checkpoint_path is not None:
+            checkpoint = Checkpoint(
+                checkpoint_path, checkpoint_interval, u"det_and_minor", line, column)
+        monitor = create_monitor(log_progress, progress)
+        eliminate(mat, size - 1, monitor, workers, executor, checkpoint=checkpoint)
+        return get_det_and_minor(mat, line, column)
+
+    def compute_sparse_det(self, log_progress=False, progress=None):
+        """
+        Computes and returns the determinant of the matrix
+        (Uses the Bareiss algorithm on the non-zero coefficients only)
+
+        The pivots are chosen with a minimum degree heuristic to limit the fill-in: the column
+        with the fewest non-zero coefficients, then its shortest row (a cheaper approximation of
+        the Markowitz cost (r - 1)(c - 1), which is not minimized over the whole matrix).
+        A row is only updated when it has a non-zero coefficient in the pivot column: the other
+        rows are lazily scaled, the division by the pivot of the step where the row was last
+        updated gives the same exact quotients as the dense algorithm.
+        See `compute_det` for `log_progress` and `progress`.
+        :param log_progress:
+        :param progress:
+        :return:
+        """
+        if not self.is_square():
+            raise Exception(u"Not a square matrix")
+
+        size = self.get_size()[0]
+        if size == 0:
+            return 1
+        rows = [{j: value for j, value in enumerate(self.get_row(i)) if value}
+                for i in range(size)]
+        columns = [set() for _ in range(size)]
+        for i, row in enumerate(rows):
+            for j in row:
+                columns[j].add(i)
+
+        # `pivots[s]` is the pivot of the step `s`, a row at level `s` was last updated at step `s`
+        pivots = [None]
+        levels = [0] * size
+        active_columns = set(range(size))
+        row_order = []
+        column_order = []
+        monitor = create_monitor(log_progress, progress)
+        if monitor is not None:
+            monitor.start()
+
+        for step in range(1, size + 1):
+            multiplies = 0
+            divides = 0
+            column = min(active_columns, key=lambda j: len(columns[j]))
+            if not columns[column]:
+                return zero_of((self.storage,))
+            line = min(columns[column], key=lambda i: len(rows[i]))
+            pivot_row = rows[line]
+            level = levels[line]
+            if level != step - 1:
+                multiplies += len(pivot_row)
+                divides += len(pivot_row) if level > 0 else 0
+                for j, value in pivot_row.items():
+                    value *= pivots[step - 1]
+                    if level > 0:
+                        value //= pivots[level]
+                    pivot_row[j] = value
+            pivot = pivot_row.pop(column)
+
+            for i in columns[column]:
+                if i == line:
+                    continue
+                row = rows[i]
+                level = levels[i]
+                factor = row.pop(column)
+                shared = sum(1 for j in pivot_row if j in row)
+                multiplies += len(row) + len(pivot_row)
+                divides += len(row) + len(pivot_row) - shared if level > 0 else 0
+                for j in list(row):
+                    if j not in pivot_row:
+                        value = row[j] * pivot
+                        if level > 0:
+                            value //= pivots[level]
+                        row[j] = value
+                for j, pivot_value in pivot_row.items():
+                    if j in row:
+                        value = bareiss_update(
+                            row[j], pivot, factor, pivot_value, pivots[level] if level else None)
+                    else:
+                        value = -(factor * pivot_value)
+                        if level > 0:
+                            value //= pivots[level]
+                    if value:
+                        if j not in row:
+                            columns[j].add(i)
+                        row[j] = value
+                    elif j in row:
+                        del row[j]
+                        columns[j].discard(i)
+                levels[i] = step
+
+            for j in pivot_row:
+                columns[j].discard(line)
+            rows[line] = None
+            columns[column] = set()
+            active_columns.discard(column)
+            pivots.append(pivot)
+            row_order.append(line)
+            column_order.append(column)
+            if monitor is not None:
+                monitor.on_step(step - 1, size, multiplies, divides,
+                                rows=(row for row in rows if row is not None))
+
+        det = pivots[size]
+        if permutation_parity(row_order) != permutation_parity(column_order):
+            det = -det
+        return det
 
     def sub_matrix(self, line, column):
         """
@@ -96,17 +554,19 @@ class Matrix(object):
         :param column:
         :return:
         """
+        lines, columns = self.get_size()
+        return self.view([i for i in range(lines) if i != line],
+                         [j for j in range(columns) if j != column])
 
-        mat = []
-        for i, row in enumerate(self.coefficients):
-            if i != line:
-                new_row = []
-                for j, value in enumerate(row):
-                    if j != column:
-                        new_row.append(value)
-                mat.append(new_row)
-
-        return Matrix(mat)
+    def permute(self, line_permutation, column_permutation):
+        """
+        Returns the matrix whose line `i` is the line `line_permutation[i]` of this matrix, and
+        the column `j` the column `column_permutation[j]`
+        :param line_permutation:
+        :param column_permutation:
+        :return:
+        """
+        return self.view(line_permutation, column_permutation)
 
     def fill_diagonal(self):
         """
@@ -119,7 +579,7 @@ class Matrix(object):
         if not self.is_square():
             raise Exception(u"Not a square matrix")
 
-        mat = clone_matrix(self.coefficients)
+        mat = self.get_rows()
         size = self.get_size()[0]
         permut = list(range(size))
 
@@ -146,5 +606,5 @@ class Matrix(object):
         The leftmost column becomes the rightmost column.
         :return:
         """
-        width = self.get_size()[1]
-        return Matrix([row[1:width] + tuple([row[0]]) for row in self.coefficients])
+        lines, columns = self.get_size()
+        return self.view(range(lines), list(range(1, columns)) + [0][:columns])
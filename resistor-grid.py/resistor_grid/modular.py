@@ -0,0 +1,267 @@
+# -*- coding: utf8 -*-
+
+"""
+This module computes exact equivalent resistances with modular arithmetic.
+The resistance between two nodes is the ratio of two minors of the Laplacian of the circuit
+(spanning 2-forests over spanning trees). Both determinants are computed modulo many word-sized
+primes, then the ratio is rebuilt with the chinese remainder theorem and a rational
+reconstruction. The Hadamard bound of the minors tells when enough primes were used.
+"""
+from fractions import Fraction
+from math import gcd
+
+from resistor_grid.laplacian import get_laplacian
+
+PRIME_LIMIT = 2 ** 31
+
+
+def is_prime(value):
+    """
+    Returns a boolean indicating whether or not `value` is a prime.
+    (Deterministic Miller-Rabin test, valid for values below 2^32)
+    :param value:
+    :return:
+    """
+    if value < 2:
+        return False
+    for small_prime in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61):
+        if value % small_prime == 0:
+            return value == small_prime
+
+    odd_part = value - 1
+    twos = 0
+    while odd_part % 2 == 0:
+        odd_part //= 2
+        twos += 1
+    for base in (2, 7, 61):
+        cur = pow(base, odd_part, value)
+        if cur == 1 or cur == value - 1:
+            continue
+        for _ in range(twos - 1):
+            cur = cur * cur % value
+            if cur == value - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def generate_primes(limit=PRIME_LIMIT):
+    """
+    Yields the primes below `limit`, in decreasing order
+    :param limit:
+    :return:
+    """
+    candidate = limit - 1
+    while candidate > 1:
+        if is_prime(candidate):
+            yield candidate
+        candidate -= 1
+
+
+def get_integer_laplacian(circuit):
+    """
+    Returns the tuple `(rows, scale)` where `rows` is the Laplacian of the circuit multiplied by
+    `scale` so that all its coefficients are integers.
+    :param circuit:
+    :return:
+    """
+    rows = get_laplacian(circuit, exact=True)
+    scale = 1
+    for row in rows:
+        for value in row.values():
+            denominator = Fraction(value).denominator
+            scale = scale * denominator // gcd(scale, denominator)
+    rows = [{j: int(value * scale) for j, value in row.items()} for row in rows]
+    return rows, scale
+
+
+def get_component(rows, node1, node2):
+    """
+    Returns the tuple `(rows, node1, node2)` of the Laplacian `rows` restricted to the nodes
+    connected to `node2`, and the new indices of the terminals. The other nodes would make the
+    minors null.
+    :param rows:
+    :param node1:
+    :param node2:
+    :return:
+    """
+    connected = set([node2])
+    stack = [node2]
+    while stack:
+        for neighbour, value in rows[stack.pop()].items():
+            if value != 0 and neighbour not in connected:
+                connected.add(neighbour)
+                stack.append(neighbour)
+    if node1 not in connected:
+        raise Exception(u"The circuit is not connected")
+
+    nodes = sorted(connected)
+    indices = {node: index for index, node in enumerate(nodes)}
+    rows = [{indices[j]: value for j, value in rows[i].items()} for i in nodes]
+    return rows, indices[node1], indices[node2]
+
+
+def hadamard_bound(rows, removed):
+    """
+    Returns an upper bound of the absolute value of the determinant of the matrix `rows` without
+    the lines and columns in `removed`
+    :param rows:
+    :param removed:
+    :return:
+    """
+    bound = 1
+    for i, row in enumerate(rows):
+        if i not in removed:
+            squared_norm = sum(value * value for j, value in row.items() if j not in removed)
+            bound *= integer_sqrt(squared_norm) + 1
+    return bound
+
+
+def integer_sqrt(value):
+    """
+    Returns the floor of the square root of a non-negative integer
+    :param value:
+    :return:
+    """
+    if value < 2:
+        return value
+    root = 1 << ((value.bit_length() + 1) // 2)
+    while True:
+        next_root = (root + value // root) // 2
+        if next_root >= root:
+            return root
+        root = next_root
+
+
+def det_mod(rows, removed, prime):
+    """
+    Returns the determinant modulo `prime` of the matrix `rows` (a list of sparse rows) without
+    the lines and columns in `removed`
+    :param rows:
+    :param removed:
+    :param prime:
+    :return:
+    """
+    order = [i for i in range(len(rows)) if i not in removed]
+    mat = {i: {j: value % prime for j, value in rows[i].items() if j not in removed}
+           for i in order}
+    det = 1
+    for column in order:
+        line = column
+        if not mat[line].get(column):
+            line = next((i for i in mat if mat[i].get(column)), None)
+            if line is None:
+                return 0
+            mat[line], mat[column] = mat[column], mat[line]
+            det = -det
+        pivot_row = mat.pop(column)
+        pivot = pivot_row.pop(column)
+        det = det * pivot % prime
+        inverse = pow(pivot, prime - 2, prime)
+        for j in pivot_row:
+            pivot_row[j] = pivot_row[j] * inverse % prime
+        for row in mat.values():
+            factor = row.pop(column, 0)
+            if factor:
+                for j, value in pivot_row.items():
+                    row[j] = (row.get(j, 0) - factor * value) % prime
+    return det % prime
+
+
+def crt(value, modulus, residue, prime):
+    """
+    Returns the tuple `(new_value, modulus * prime)` where `new_value` is congruent to `value`
+    modulo `modulus` and to `residue` modulo `prime`
+    :param value:
+    :param modulus:
+    :param residue:
+    :param prime:
+    :return:
+    """
+    correction = (residue - value) * pow(modulus, prime - 2, prime) % prime
+    return value + modulus * correction, modulus * prime
+
+
+def rational_reconstruction(value, modulus, numerator_bound=None, denominator_bound=None):
+    """
+    Returns the fraction n/d congruent to `value` modulo `modulus` with |n| at most
+    `numerator_bound` and 0 < d at most `denominator_bound` (both sqrt(modulus / 2) by default),
+    or None if there is no such fraction.
+    The fraction is unique when 2 * `numerator_bound` * `denominator_bound` < `modulus`.
+    :param value:
+    :param modulus:
+    :param numerator_bound:
+    :param denominator_bound:
+    :return:
+    """
+    if numerator_bound is None:
+        numerator_bound = integer_sqrt(modulus // 2)
+    if denominator_bound is None:
+        denominator_bound = integer_sqrt(modulus // 2)
+    old_remainder, remainder = modulus, value % modulus
+    old_coefficient, coefficient = 0, 1
+    while remainder > numerator_bound:
+        quotient = old_remainder // remainder
+        old_remainder, remainder = remainder, old_remainder - quotient * remainder
+        old_coefficient, coefficient = coefficient, old_coefficient - quotient * coefficient
+    if coefficient == 0 or abs(coefficient) > denominator_bound:
+        return None
+    if gcd(remainder, coefficient) != 1:
+        return None
+    if coefficient < 0:
+        remainder, coefficient = -remainder, -coefficient
+    return Fraction(remainder, coefficient)
+
+
+def compute_resistance(circuit, node1=0, node2=1, early_stop=None):
+    """
+    Returns the exact equivalent resistance between the nodes `node1` and `node2` of `circuit` as
+    a `Fraction`.
+    The computation stops once the Hadamard bound guarantees the result. If `early_stop` is not
+    None, it also stops once the same fraction was reconstructed for `early_stop` more primes:
+    this is faster but the result is not guaranteed.
+    :param circuit:
+    :param node1:
+    :param node2:
+    :param early_stop:
+    :return:
+    """
+    if node1 == node2:
+        raise Exception(u"Cannot get resistance for same node")
+
+    rows, scale = get_integer_laplacian(circuit)
+    rows, node1, node2 = get_component(rows, node1, node2)
+    trees = set([node2])
+    forests = set([node1, node2])
+    # The result is the ratio of two determinants bounded by these values
+    forests_bound = hadamard_bound(rows, forests)
+    trees_bound = hadamard_bound(rows, trees)
+    # A non-zero determinant cannot be divisible by more primes than this
+    max_zeros = trees_bound.bit_length() // (PRIME_LIMIT.bit_length() - 2) + 1
+
+    value, modulus = 0, 1
+    candidate = None
+    agreements = 0
+    zeros = 0
+    for prime in generate_primes():
+        trees_det = det_mod(rows, trees, prime)
+        if trees_det == 0:
+            zeros += 1
+            if zeros > max_zeros:
+                raise Exception(u"The circuit is not connected")
+            continue
+        ratio = det_mod(rows, forests, prime) * pow(trees_det, prime - 2, prime) % prime
+        value, modulus = crt(value, modulus, ratio, prime)
+        if modulus > 2 * forests_bound * trees_bound:
+            return rational_reconstruction(value, modulus, forests_bound, trees_bound) * scale
+
+        reconstructed = rational_reconstruction(value, modulus)
+        if reconstructed is not None and reconstructed == candidate:
+            agreements += 1
+            if early_stop is not None and agreements >= early_stop:
+                return candidate * scale
+        else:
+            candidate = reconstructed
+            agreements = 0
+    raise Exception(u"Not enough primes")
@@ -0,0 +1,243 @@
+# -*- coding: utf8 -*-
+
+"""
+This module computes the equivalent resistance between two nodes of the large rectangular grids
+of `create_grid` and `create_knight_grid` with a geometric multigrid solver.
+The grid is described by its size `width`×`height` and the positions `(column, line)` of the
+terminals, the Laplacian is built directly from this structure instead of from a `Circuit`. The
+nodes swapped by `create_knight_grid` are mapped back to their positions by
+`get_knight_positions`, so the coarse grids keep the geometry of the grid.
+
+The coarse grids keep every other line and column (and the last ones), the prolongation is the
+bilinear interpolation and the coarse operators are the Galerkin products P^T.A.P. A V-cycle (or
+W-cycle) with damped Jacobi smoothing preconditions a conjugate gradient: each iteration costs
+O(nodes). The resistance b^T.x (b = e_node1 - e_node2) grows monotonically with the iterations
+of the conjugate gradient, its increments estimate the remaining error.
+It requires the optional dependencies `numpy` and `scipy`.
+"""
+from resistor_grid.circuit import get_knight_swaps, get_swapped_nodes
+from resistor_grid.numeric import ensure_numeric
+
+try:
+    import numpy
+    from scipy import sparse
+except ImportError:
+    numpy = None
+    sparse = None
+
+COARSEST_SIZE = 64
+JACOBI_WEIGHT = 0.6
+
+
+def get_path_laplacian(size):
+    """
+    Returns the Laplacian of a path of `size` unit resistors
+    :param size:
+    :return:
+    """
+    diagonal = numpy.full(size, 2.0)
+    if size > 0:
+        diagonal[0] = diagonal[-1] = 1.0
+    if size == 1:
+        diagonal[0] = 0.0
+    off_diagonal = -numpy.ones(max(size - 1, 0))
+    return sparse.diags([off_diagonal, diagonal, off_diagonal], [-1, 0, 1], format=u"csr")
+
+
+def get_grid_laplacian(width, height):
+    """
+    Returns the Laplacian of the grid of 1 Ohm resistors of size `width`×`height` (the node at
+    the position `(column, line)` is `line * width + column`)
+    :param width:
+    :param height:
+    :return:
+    """
+    ensure_numeric()
+
+    return (sparse.kron(sparse.identity(height), get_path_laplacian(width)) +
+            sparse.kron(get_path_laplacian(height), sparse.identity(width))).tocsr()
+
+
+def get_interpolation(size):
+    """
+    Returns the linear interpolation from the coarse points (every other point and the last one)
+    to the `size` points of a line
+    :param size:
+    :return:
+    """
+    coarse_points = list(range(0, size, 2))
+    if coarse_points[-1] != size - 1:
+        coarse_points.append(size - 1)
+    lines = []
+    columns = []
+    values = []
+    for index, point in enumerate(coarse_points):
+        lines.append(point)
+        columns.append(index)
+        values.append(1.0)
+        if index + 1 < len(coarse_points) and coarse_points[index + 1] - point == 2:
+            lines.extend((point + 1, point + 1))
+            columns.extend((index, index + 1))
+            values.extend((0.5, 0.5))
+    return sparse.csr_matrix((values, (lines, columns)), shape=(size, len(coarse_points)))
+
+
+class Level(object):
+    """
+    This class represents a level of the multigrid hierarchy: its operator, the inverse of its
+    diagonal and the prolongation from the next (coarser) level
+    """
+    def __init__(self, operator, width, height):
+        self.operator = operator
+        self.width = width
+        self.height = height
+        self.inverse_diagonal = 1.0 / operator.diagonal()
+        self.prolongation = None
+        self.restriction = None
+
+
+class GridMultigrid(object):
+    """
+    This class holds the multigrid hierarchy of the grid of size `width`×`height`.
+    `cycle` is either "V" or "W".
+    """
+    def __init__(self, width, height, cycle=u"V", smoothing_steps=2):
+        ensure_numeric()
+        if cycle not in (u"V", u"W"):
+            raise Exception(u"Unknown cycle: {}".format(cycle))
+
+        self.cycle_count = 1 if cycle == u"V" else 2
+        self.smoothing_steps = smoothing_steps
+        self.levels = [Level(get_grid_laplacian(width, height), width, height)]
+        while width * height > COARSEST_SIZE and (width > 2 or height > 2):
+            level = self.levels[-1]
+            interpolation_x = get_interpolation(width)
+            interpolation_y = get_interpolation(height)
+            width = interpolation_x.shape[1]
+            height = interpolation_y.shape[1]
+            level.prolongation = sparse.kron(interpolation_y, interpolation_x).tocsr()
+            level.restriction = level.prolongation.T.tocsr()
+            operator = (level.restriction @ level.operator @ level.prolongation).tocsr()
+            self.levels.append(Level(operator, width, height))
+        # The coarsest operator is singular (the constants): its pseudo-inverse solves it
+        self.coarsest_inverse = numpy.linalg.pinv(self.levels[-1].operator.toarray())
+
+    def smooth(self, level, solution, rhs):
+        """
+        Applies the damped Jacobi smoother to `solution` and returns it
+        :param level:
+        :param solution:
+        :param rhs:
+        :return:
+        """
+        for _ in range(self.smoothing_steps):
+            solution = solution + JACOBI_WEIGHT * level.inverse_diagonal * (
+                rhs - level.operator @ solution)
+        return solution
+
+    def cycle(self, rhs, index=0):
+        """
+        Returns the approximate solution of the level `index` for `rhs` (one multigrid cycle from
+        a zero initial guess)
+        :param rhs:
+        :param index:
+        :return:
+        """
+        if index == len(self.levels) - 1:
+            return self.coarsest_inverse @ rhs
+
+        level = self.levels[index]
+        solution = self.smooth(level, numpy.zeros_like(rhs), rhs)
+        for _ in range(self.cycle_count):
+            residual = level.restriction @ (rhs - level.operator @ solution)
+            solution = solution + level.prolongation @ self.cycle(residual, index + 1)
+        return self.smooth(level, solution, rhs)
+
+    def compute_resistance(self, node1, node2, tolerance=1e-10, max_iterations=200):
+        """
+        Returns the tuple `(resistance, error)` between the nodes `node1` and `node2` of the
+        finest grid: the multigrid preconditioned conjugate gradient stops when the estimated
+        error is below `tolerance`
+        :param node1:
+        :param node2:
+        :param tolerance:
+        :param max_iterations:
+        :return:
+        """
+        if node1 == node2:
+            raise Exception(u"Cannot get resistance for same node")
+
+        operator = self.levels[0].operator
+        rhs = numpy.zeros(operator.shape[0])
+        rhs[node1] = 1.0
+        rhs[node2] = -1.0
+
+        solution = numpy.zeros_like(rhs)
+        residual = rhs.copy()
+        preconditioned = self.cycle(residual)
+        direction = preconditioned.copy()
+        product = residual @ preconditioned
+        resistance = 0.0
+        increment = None
+        for _ in range(max_iterations):
+            image = operator @ direction
+            step = product / (direction @ image)
+            solution += step * direction
+            residual -= step * image
+            new_resistance = rhs @ solution
+            new_increment = new_resistance - resistance
+            resistance = new_resistance
+            # The increments decrease geometrically: their sum bounds the remaining error
+            error = new_increment
+            if increment is not None and 0 < new_increment < increment:
+                ratio = new_increment / increment
+                error = new_increment * ratio / (1.0 - ratio)
+            increment = new_increment
+            if abs(error) < tolerance:
+                return float(resistance), float(abs(error))
+
+            preconditioned = self.cycle(residual)
+            new_product = residual @ preconditioned
+            direction = preconditioned + (new_product / product) * direction
+            product = new_product
+        raise Exception(u"The multigrid solver did not converge")
+
+
+def compute_grid_resistance(width, height, position1, position2, tolerance=1e-10, cycle=u"V"):
+    """
+    Returns the tuple `(resistance, error)` between the nodes at the positions `position1` and
+    `position2` (tuples `(column, line)`) of the grid of size `width`×`height`
+    :param width:
+    :param height:
+    :param position1:
+    :param position2:
+    :param tolerance:
+    :param cycle:
+    :return:
+    """
+    node1 = position1[1] * width + position1[0]
+    node2 = position2[1] * width + position2[0]
+    return GridMultigrid(width, height, cycle).compute_resistance(node1, node2, tolerance)
+
+
+def get_knight_positions(width):
+    """
+    Returns the positions `(column, line)` of the nodes 0 and 1 of `create_knight_grid(width)`
+    :param width:
+    :return:
+    """
+    swaps = get_knight_swaps(width)
+    nodes = get_swapped_nodes(max(max(pair) for pair in swaps) + 1, swaps)
+    return tuple((nodes.index(node) % width, nodes.index(node) // width) for node in (0, 1))
+
+
+def compute_knight_resistance(width, tolerance=1e-10, cycle=u"V"):
+    """
+    Returns the tuple `(resistance, error)` of the knight grid of width `width`
+    :param width:
+    :param tolerance:
+    :param cycle:
+    :return:
+    """
+    position1, position2 = get_knight_positions(width)
+    return compute_grid_resistance(width, width + 1, position1, position2, tolerance, cycle)
@@ -0,0 +1,205 @@
+# -*- coding: utf8 -*-
+
+"""
+This module computes equivalent resistances with floating point numbers.
+It builds the conductance matrix (the Laplacian of the circuit) as a `scipy.sparse` matrix and
+solves it with a sparse direct (LU with a symmetric fill-reducing ordering) or iterative
+(conjugate gradient) solver. It requires the optional dependencies `numpy` and `scipy`.
+"""
+from resistor_grid.laplacian import get_conductance, get_most_frequent_node
+
+try:
+    import numpy
+    from scipy import sparse
+    from scipy.sparse import csgraph, linalg
+except ImportError:
+    numpy = None
+    sparse = None
+    csgraph = None
+    linalg = None
+
+
+def ensure_numeric():
+    """
+    Raises an exception if the optional dependencies are missing
+    :return:
+    """
+    if numpy is None:
+        raise Exception(u"The numeric engine requires numpy and scipy")
+
+
+def get_conductance_matrix(circuit):
+    """
+    Returns the conductance matrix (Laplacian) of the circuit as a CSR matrix
+    :param circuit:
+    :return:
+    """
+    ensure_numeric()
+
+    skip_default = get_conductance(circuit.default_value, exact=False) == 0
+    nodes1 = []
+    nodes2 = []
+    conductances = []
+    # The grids share the same value objects between many resistors
+    known_conductances = {}
+    for node1, node2, value in circuit.get_edges(skip_default):
+        conductance = known_conductances.get(id(value))
+        if conductance is None:
+            conductance = get_conductance(value, exact=False)
+            known_conductances[id(value)] = conductance
+        if conductance != 0:
+            nodes1.append(node1)
+            nodes2.append(node2)
+            conductances.append(conductance)
+
+    return get_laplacian(circuit.size, numpy.array(nodes1, dtype=numpy.int64),
+                         numpy.array(nodes2, dtype=numpy.int64),
+                         numpy.array(conductances, dtype=numpy.float64))
+
+
+def get_laplacian(size, nodes1, nodes2, conductances):
+    """
+    Returns the Laplacian (as a CSR matrix) of the circuit of `size` nodes whose resistors are
+    given by the arrays `nodes1`, `nodes2` and `conductances`
+    :param size:
+    :param nodes1:
+    :param nodes2:
+    :param conductances:
+    :return:
+    """
+    diagonal = numpy.bincount(nodes1, conductances, size)
+    diagonal += numpy.bincount(nodes2, conductances, size)
+    nodes = numpy.arange(size)
+
+    lines = numpy.concatenate((nodes1, nodes2, nodes))
+    columns = numpy.concatenate((nodes2, nodes1, nodes))
+    values = numpy.concatenate((-conductances, -conductances, diagonal))
+    return sparse.csr_matrix((values, (lines, columns)), shape=(size, size))
+
+
+def remove_node(mat, node):
+    """
+    Returns the matrix `mat` without the line and the column `node` (the grounded node)
+    :param mat:
+    :param node:
+    :return:
+    """
+    kept = numpy.ones(mat.shape[0], dtype=bool)
+    kept[node] = False
+    return mat[kept][:, kept]
+
+
+def get_component(mat, node, nodes):
+    """
+    Returns the tuple `(component, indices)` where `component` is the matrix `mat` restricted to
+    the nodes connected to `node` (the other nodes would make it singular) and `indices` the new
+    indices of the array `nodes`, which must all be connected to `node`
+    :param mat:
+    :param node:
+    :param nodes:
+    :return:
+    """
+    _, labels = csgraph.connected_components(mat, directed=False)
+    kept = labels == labels[node]
+    disconnected = numpy.flatnonzero(~kept[nodes])
+    if len(disconnected) > 0:
+        raise Exception(u"The node {} is not connected to the ground".format(
+            nodes[disconnected[0]]))
+    if numpy.all(kept):
+        return mat, nodes
+    return mat[kept][:, kept], (numpy.cumsum(kept) - 1)[nodes]
+
+
+def solve(mat, rhs, method=u"direct", tolerance=1e-12):
+    """
+    Solves the symmetric positive definite system `mat`.x = `rhs` and returns x
+    `method` is either "direct" (sparse LU) or "cg" (Jacobi-preconditioned conjugate gradient)
+    :param mat:
+    :param rhs:
+    :param method:
+    :param tolerance:
+    :return:
+    """
+    if method == u"direct":
+        return linalg.splu(mat.tocsc(), permc_spec=u"MMD_AT_PLUS_A").solve(rhs)
+    elif method == u"cg":
+        preconditioner = sparse.diags(1.0 / mat.diagonal())
+        result, info = linalg.cg(mat, rhs, rtol=tolerance, atol=0.0, M=preconditioner)
+        if info != 0:
+            raise Exception(u"The conjugate gradient did not converge")
+        return result
+    raise Exception(u"Unknown method: {}".format(method))
+
+
+def compute_resistance(circuit, node1=0, node2=1, method=u"direct", tolerance=1e-12):
+    """
+    Returns the equivalent resistance between the nodes `node1` and `node2` of `circuit`
+    :param circuit:
+    :param node1:
+    :param node2:
+    :param method:
+    :param tolerance:
+    :return:
+    """
+    return get_resistance(get_conductance_matrix(circuit), node1, node2, method, tolerance)
+
+
+def get_resistance(conductance_matrix, node1=0, node2=1, method=u"direct", tolerance=1e-12):
+    """
+    Returns the equivalent resistance between the nodes `node1` and `node2` of the circuit of
+    conductance matrix `conductance_matrix`
+    :param conductance_matrix:
+    :param node1:
+    :param node2:
+    :param method:
+    :param tolerance:
+    :return:
+    """
+    if node1 == node2:
+        raise Exception(u"Cannot get resistance for same node")
+
+    conductance_matrix, (node1, node2) = get_component(
+        conductance_matrix, node2, numpy.array([node1, node2]))
+    mat = remove_node(conductance_matrix, node2)
+    rhs = numpy.zeros(mat.shape[0])
+    index = node1 if node1 < node2 else node1 - 1
+    rhs[index] = 1.0
+    return float(solve(mat, rhs, method, tolerance)[index])
+
+
+def compute_resistances(circuit, pairs):
+    """
+    Returns the array of the equivalent resistances between the nodes of each pair of `pairs`
+    (a list of tuples `(node1, node2)`). The conductance matrix is factorized once (sparse LU)
+    and solved for all the distinct nodes at once, as the columns of a right-hand side matrix.
+    :param circuit:
+    :param pairs:
+    :return:
+    """
+    ensure_numeric()
+
+    pairs = numpy.asarray(pairs, dtype=numpy.int64).reshape(-1, 2)
+    if numpy.any(pairs[:, 0] == pairs[:, 1]):
+        raise Exception(u"Cannot get resistance for same node")
+    ground = get_most_frequent_node(pairs.tolist())
+    nodes, indices = numpy.unique(pairs, return_inverse=True)
+    indices = indices.reshape(-1, 2)
+
+    conductance_matrix, reduced = get_component(
+        get_conductance_matrix(circuit), ground, numpy.append(nodes, ground))
+    nodes = reduced[:-1]
+    ground = reduced[-1]
+    mat = remove_node(conductance_matrix, ground)
+    reduced_nodes = nodes - (nodes > ground)
+    solved = nodes != ground
+    rhs = numpy.zeros((mat.shape[0], len(nodes)))
+    rhs[reduced_nodes[solved], numpy.flatnonzero(solved)] = 1.0
+    solution = linalg.splu(mat.tocsc(), permc_spec=u"MMD_AT_PLUS_A").solve(rhs)
+
+    # `potentials[a, b]`: potential of the node `nodes[a]` for a unit current into `nodes[b]`
+    potentials = numpy.zeros((len(nodes), len(nodes)))
+    potentials[solved] = solution[reduced_nodes[solved]]
+    first = indices[:, 0]
+    second = indices[:, 1]
+    return (potentials[first, first] + potentials[second, second] -
+            2.0 * potentials[second, first])
@@ -4,6 +4,11 @@
 This module provides utilities to handle polynomials
 """
 
+# Below this length (number of coefficients of the shortest factor), the schoolbook product wins
+KARATSUBA_THRESHOLD = 32
+# From this length, integer polynomials are multiplied by packing them into a single big integer
+KRONECKER_THRESHOLD = 16
+
 
 def normalize_coefficients(coefficients):
     """
@@ -11,13 +16,223 @@ def normalize_coefficients(coefficients):
     :param coefficients:
     :return:
     """
-    normalized = []
-    found_non_zero = False
-    for coefficient in reversed(coefficients):
-        if found_non_zero or coefficient != 0:
-            normalized.append(coefficient)
-            found_non_zero = True
-    return reversed(normalized)
+    end = len(coefficients)
+    while end > 0 and coefficients[end - 1] == 0:
+        end -= 1
+    return coefficients[:end]
+
+
+def is_integer_list(coefficients):
+    """
+    Returns a boolean indicating whether or not all the coefficients are integers
+    :param coefficients:
+    :return:
+    """
+    for coefficient in coefficients:
+        if not isinstance(coefficient, int):
+            return False
+    return True
+
+
+def schoolbook_multiply(coefficients1, coefficients2):
+    """
+    Returns the coefficients of the product of two polynomials (quadratic algorithm)
+    :param coefficients1:
+    :param coefficients2:
+    :return:
+    """
+    if not coefficients1 or not coefficients2:
+        return []
+    product = [0] * (len(coefficients1) + len(coefficients2) - 1)
+    for index1, coefficient1 in enumerate(coefficients1):
+        if coefficient1:
+            for index2, coefficient2 in enumerate(coefficients2):
+                product[index1 + index2] += coefficient1 * coefficient2
+    return product
+
+
+def karatsuba_multiply(coefficients1, coefficients2):
+    """
+    Returns the coefficients of the product of two polynomials (Karatsuba algorithm)
+    :param coefficients1:
+    :param coefficients2:
+    :return:
+    """
+    if min(len(coefficients1), len(coefficients2)) < KARATSUBA_THRESHOLD:
+        return schoolbook_multiply(coefficients1, coefficients2)
+
+    half = max(len(coefficients1), len(coefficients2)) // 2
+    low1, high1 = coefficients1[:half], coefficients1[half:]
+    low2, high2 = coefficients2[:half], coefficients2[half:]
+    low = karatsuba_multiply(low1, low2)
+    high = karatsuba_multiply(high1, high2)
+    middle = karatsuba_multiply(add_coefficients(low1, high1), add_coefficients(low2, high2))
+
+    product = [0] * (len(coefficients1) + len(coefficients2) - 1)
+    for index, coefficient in enumerate(low):
+        product[index] += coefficient
+        middle[index] -= coefficient
+    for index, coefficient in enumerate(high):
+        product[index + 2 * half] += coefficient
+        middle[index] -= coefficient
+    for index, coefficient in enumerate(middle):
+        if index + half < len(product):
+            product[index + half] += coefficient
+    return product
+
+
+def add_coefficients(coefficients1, coefficients2):
+    """
+    Returns the coefficients of the sum of two polynomials (without normalization)
+    :param coefficients1:
+    :param coefficients2:
+    :return:
+    """
+    if len(coefficients1) < len(coefficients2):
+        coefficients1, coefficients2 = coefficients2, coefficients1
+    result = list(coefficients1)
+    for index, coefficient in enumerate(coefficients2):
+        result[index] += coefficient
+    return result
+
+
+def pack_coefficients(coefficients, chunk_size):
+    """
+    Returns the integer P(2^(8 * chunk_size)) for the polynomial P with integer coefficients
+    (Kronecker substitution), each coefficient must fit in `chunk_size` signed bytes
+    :param coefficients:
+    :param chunk_size:
+    :return:
+    """
+    data = b"".join(coefficient.to_bytes(chunk_size, "little", signed=True)
+                    for coefficient in coefficients)
+    # Each negative coefficient was stored with a borrow of one unit from the following chunk
+    padding = b"\x00" * (chunk_size - 1)
+    borrows = b"".join((b"\x01" if coefficient < 0 else b"\x00") + padding
+                       for coefficient in coefficients)
+    return int.from_bytes(data, "little") - (int.from_bytes(borrows, "little") << (8 * chunk_size))
+
+
+def unpack_coefficients(value, chunk_size, length):
+    """
+    Returns the `length` coefficients of the polynomial packed in `value` by `pack_coefficients`
+    :param value:
+    :param chunk_size:
+    :param length:
+    :return:
+    """
+    data = value.to_bytes(chunk_size * length, "little", signed=True)
+    half = 1 << (8 * chunk_size - 1)
+    full = half << 1
+    coefficients = []
+    carry = 0
+    for start in range(0, chunk_size * length, chunk_size):
+        coefficient = int.from_bytes(data[start:start + chunk_size], "little") + carry
+        if coefficient >= half:
+            coefficient -= full
+            carry = 1
+        else:
+            carry = 0
+        coefficients.append(coefficient)
+    return coefficients
+
+
+def get_max_bit_length(coefficients):
+    """
+    Returns the maximum bit length of the absolute values of integer coefficients
+    :param coefficients:
+    :return:
+    """
+    return max(abs(coefficient).bit_length() for coefficient in coefficients)
+
+
+def kronecker_multiply(coefficients1, coefficients2):
+    """
+    Returns the coefficients of the product of two polynomials with integer coefficients
+    (Kronecker substitution: the polynomials are packed into two big integers)
+    :param coefficients1:
+    :param coefficients2:
+    :return:
+    """
+    if not coefficients1 or not coefficients2:
+        return []
+    length = len(coefficients1) + len(coefficients2) - 1
+    bits = get_max_bit_length(coefficients1) + get_max_bit_length(coefficients2)
+    bits += min(len(coefficients1), len(coefficients2)).bit_length() + 1
+    chunk_size = bits // 8 + 1
+    product = pack_coefficients(coefficients1, chunk_size) * \
+        pack_coefficients(coefficients2, chunk_size)
+    return unpack_coefficients(product, chunk_size, length)
+
+
+def multiply_coefficients(coefficients1, coefficients2):
+    """
+    Returns the coefficients of the product of two polynomials, using the fastest algorithm for
+    their length and the type of their coefficients
+    :param coefficients1:
+    :param coefficients2:
+    :return:
+    """
+    shortest = min(len(coefficients1), len(coefficients2))
+    if shortest >= KRONECKER_THRESHOLD and is_integer_list(coefficients1) \
+            and is_integer_list(coefficients2):
+        return kronecker_multiply(coefficients1, coefficients2)
+    elif shortest >= KARATSUBA_THRESHOLD:
+        return karatsuba_multiply(coefficients1, coefficients2)
+    return schoolbook_multiply(coefficients1, coefficients2)
+
+
+def divide_coefficients(remainder, divisor):
+    """
+    Returns the coefficients of the quotient of the long division of `remainder` by `divisor`.
+    The division is done in place: `remainder` then holds the remainder (with trailing zeros).
+    :param remainder:
+    :param divisor:
+    :return:
+    """
+    divisor_length = len(divisor)
+    leading = divisor[divisor_length - 1]
+    quotient = [0] * (len(remainder) - divisor_length + 1)
+    for deg in reversed(range(len(quotient))):
+        main_quotient = remainder[deg + divisor_length - 1] // leading
+        quotient[deg] = main_quotient
+        if main_quotient:
+            for index, coefficient in enumerate(divisor):
+                remainder[deg + index] -= main_quotient * coefficient
+    return quotient
+
+
+def divide_exact_coefficients(dividend, divisor, verify=True):
+    """
+    Returns the coefficients of the quotient of two polynomials with integer coefficients when the
+    division is exact (Kronecker substitution). The trailing coefficients must be non-zero.
+    The chunks hold the coefficients of both polynomials and the Mignotte bound of the quotient,
+    so the result is proven when the division is exact. If `verify` is true, returns None when
+    the division is not exact.
+    :param dividend:
+    :param divisor:
+    :param verify:
+    :return:
+    """
+    length = len(dividend) - len(divisor) + 1
+    if length <= 0:
+        return [] if not dividend else None
+    # Bound of the coefficients of a factor of `dividend` (Mignotte)
+    bits = get_max_bit_length(dividend) + len(dividend).bit_length() + length + 1
+    bits = max(bits, get_max_bit_length(divisor))
+    chunk_size = bits // 8 + 1
+    quotient, remainder = divmod(
+        pack_coefficients(dividend, chunk_size), pack_coefficients(divisor, chunk_size))
+    if remainder:
+        return None
+    try:
+        quotient = unpack_coefficients(quotient, chunk_size, length)
+    except OverflowError:
+        # The quotient does not fit in the bound: the division is not exact
+        return None
+    if verify and kronecker_multiply(quotient, divisor) != list(dividend):
+        return None
+    return quotient
 
 
 class Polynomial(object):
@@ -27,6 +242,7 @@ class Polynomial(object):
     with any coefficient.
     The coefficients are immutable
     """
+    __slots__ = ("coefficients",)
 
     def __init__(self, coefficients):
         self.coefficients = tuple(normalize_coefficients(coefficients))
@@ -58,6 +274,11 @@ class Polynomial(object):
 
         return u"P[" + u" ".join(reversed(monomials)) + u"]"
 
+    def __bool__(self):
+        return self.deg() >= 0
+
+    __nonzero__ = __bool__
+
     def __add__(self, other):
         return self.add(other)
 
@@ -107,7 +328,13 @@ class Polynomial(object):
         :param other_polynomial:
         :return:
         """
-        return self.add(other_polynomial.neg())
+        other_coefficients = other_polynomial.coefficients
+        new_coefficients = list(self.coefficients)
+        if len(new_coefficients) < len(other_coefficients):
+            new_coefficients.extend([0] * (len(other_coefficients) - len(new_coefficients)))
+        for index, coefficient in enumerate(other_coefficients):
+            new_coefficients[index] -= coefficient
+        return Polynomial(new_coefficients)
 
     def mul(self, other_polynomial):
         """
@@ -115,11 +342,7 @@ class Polynomial(object):
         :param other_polynomial:
         :return:
         """
-        new_coefficients = [0] * (len(self.coefficients) + len(other_polynomial.coefficients))
-        for self_index, self_coefficient in enumerate(self.coefficients):
-            for other_index, other_coefficient in enumerate(other_polynomial.coefficients):
-                new_coefficients[self_index + other_index] += self_coefficient * other_coefficient
-        return Polynomial(new_coefficients)
+        return Polynomial(multiply_coefficients(self.coefficients, other_polynomial.coefficients))
 
     def div(self, other_polynomial):
         """
@@ -130,17 +353,51 @@ class Polynomial(object):
         if other_polynomial.deg() < 0:
             raise Exception(u"Dividing by null polynomial")
 
-        remainder = list(self.coefficients)
-        divisor = list(other_polynomial.coefficients)
-        quotient = [0] * (len(remainder) - len(divisor) + 1)
+        if len(other_polynomial.coefficients) >= KRONECKER_THRESHOLD and \
+                is_integer_list(self.coefficients) and \
+                is_integer_list(other_polynomial.coefficients):
+            try:
+                quotient = divide_exact_coefficients(self.coefficients,
+                                                     other_polynomial.coefficients)
+            except OverflowError:
+                quotient = None
+            if quotient is not None:
+                return Polynomial(quotient)
 
-        while len(remainder) >= len(divisor):
-            main_quotient = remainder[len(remainder) - 1] // divisor[len(divisor) - 1]
-            deg = len(remainder) - len(divisor)
-            quotient[deg] = main_quotient
-            for i in range(len(remainder) - len(divisor), len(remainder) - 1):
-                remainder[i] -= main_quotient * divisor[i - deg]
+        return Polynomial(divide_coefficients(
+            list(self.coefficients), other_polynomial.coefficients))
+
+    def bareiss_update(self, pivot, left, top, previous_pivot=None):
+        """
+        Returns the polynomial (self * pivot - left * top) // previous_pivot, the update of a
+        coefficient during a step of the Bareiss algorithm.
+        The products are accumulated in a single list of coefficients and the division (which
+        must be exact) is done in place, without intermediate polynomials.
+        :param pivot:
+        :param left:
+        :param top:
+        :param previous_pivot:
+        :return:
+        """
+        result = multiply_coefficients(self.coefficients, pivot.coefficients)
+        product = multiply_coefficients(left.coefficients, top.coefficients)
+        if len(result) < len(product):
+            result.extend([0] * (len(product) - len(result)))
+        for index, coefficient in enumerate(product):
+            result[index] -= coefficient
+        result = normalize_coefficients(result)
 
-            remainder.pop()
+        if previous_pivot is not None and result:
+            divisor = previous_pivot.coefficients
+            quotient = None
+            if len(divisor) >= KRONECKER_THRESHOLD and is_integer_list(result) and \
+                    is_integer_list(divisor):
+                # The division is exact, so the bound of `divide_exact_coefficients` proves the
+                # quotient without verifying it
+                try:
+                    quotient = divide_exact_coefficients(result, divisor, verify=False)
+                except OverflowError:
+                    quotient = None
+            result = divide_coefficients(result, divisor) if quotient is None else quotient
 
-        return Polynomial(quotient)
+        return Polynomial(result)
@@ -0,0 +1,107 @@
+# -*- coding: utf8 -*-
+
+"""
+This module reduces a circuit to the equivalent resistor between two terminals with graph
+transformations. The interior nodes are eliminated one by one with the star-mesh transform: the
+node `k` with the conductances g_1, ..., g_d to its neighbours is replaced by a conductance
+g_i.g_j / (g_1 + ... + g_d) between each pair of neighbours. The parallel conductances are summed
+as soon as they appear, so the series (d = 2), star-delta (d = 3) and parallel reductions are all
+special cases.
+
+The eliminations create new conductances (the fill-in) between the neighbours: the node of
+minimum degree is eliminated first to keep it low. On planar grids, this works on the nodes of
+the circuit instead of the pairs of nodes of the mesh matrix.
+"""
+import heapq
+
+from resistor_grid.laplacian import get_conductance
+
+
+def get_graph(circuit, exact=True):
+    """
+    Returns the conductance graph of the circuit: `graph[i]` maps each neighbour of the node `i` to
+    the conductance between them. The open circuits are left out.
+    :param circuit:
+    :param exact:
+    :return:
+    """
+    graph = [{} for _ in range(circuit.size)]
+    skip_default = get_conductance(circuit.default_value, exact) == 0
+    for node1, node2, value in circuit.get_edges(skip_default):
+        conductance = get_conductance(value, exact)
+        if conductance != 0:
+            graph[node1][node2] = conductance
+            graph[node2][node1] = conductance
+    return graph
+
+
+def eliminate_node(graph, node):
+    """
+    Removes `node` from `graph` with the star-mesh transform
+    :param graph:
+    :param node:
+    :return:
+    """
+    neighbours = graph[node]
+    graph[node] = None
+    for neighbour in neighbours:
+        del graph[neighbour][node]
+
+    total = sum(neighbours.values())
+    items = list(neighbours.items())
+    for index, (node1, conductance1) in enumerate(items):
+        scaled = conductance1 / total
+        neighbours1 = graph[node1]
+        for node2, conductance2 in items[index + 1:]:
+            conductance = scaled * conductance2
+            neighbours1[node2] = neighbours1.get(node2, 0) + conductance
+            graph[node2][node1] = neighbours1[node2]
+
+
+def reduce_graph(graph, terminals):
+    """
+    Eliminates all the nodes of `graph` except the `terminals`, by increasing degree.
+    Returns the order of elimination.
+    :param graph:
+    :param terminals:
+    :return:
+    """
+    heap = [(len(neighbours), node) for node, neighbours in enumerate(graph)
+            if node not in terminals]
+    heapq.heapify(heap)
+    order = []
+    while heap:
+        degree, node = heapq.heappop(heap)
+        neighbours = graph[node]
+        if neighbours is None:
+            continue
+        if degree != len(neighbours):
+            # The degree changed since the node was pushed
+            heapq.heappush(heap, (len(neighbours), node))
+            continue
+        eliminate_node(graph, node)
+        order.append(node)
+        for neighbour in neighbours:
+            if neighbour not in terminals:
+                heapq.heappush(heap, (len(graph[neighbour]), neighbour))
+    return order
+
+
+def compute_resistance(circuit, node1=0, node2=1, exact=True):
+    """
+    Returns the equivalent resistance between the nodes `node1` and `node2` of `circuit`
+    :param circuit:
+    :param node1:
+    :param node2:
+    :param exact:
+    :return:
+    """
+    if node1 == node2:
+        raise Exception(u"Cannot get resistance for same node")
+
+    graph = get_graph(circuit, exact)
+    reduce_graph(graph, (node1, node2))
+    conductance = graph[node1].get(node2, 0)
+    if conductance == 0:
+        raise Exception(u"The nodes {} and {} are not connected".format(node1, node2))
+    return 1 / conductance
@@ -0,0 +1,371 @@
+# -*- coding: utf8 -*-
+
+"""
+This module saves circuits in a compact binary file and maps them back into memory.
+The file holds a header (the number of nodes, of resistors and of distinct values, and the two
+terminals), then the resistors in the CSR format, each one stored once (node1 < node2):
+ - `indptr` (int64, size + 1): the resistors of the node `i` are `indptr[i]:indptr[i + 1]`,
+ - `indices` (uint32, one per resistor): their other node,
+ - `value_ids` (uint32, one per resistor): their index in the value table,
+ - `values` (float64): the table of the distinct resistances.
+Each array starts on a multiple of 8 bytes, so `MappedCircuit` opens the file with `mmap` and
+reads the arrays as NumPy views without copying them. The pages are shared by all the processes
+mapping the same file, and a `MappedCircuit` is pickled as its path.
+
+The resistances are stored as floating point numbers, the open resistors (see
+`laplacian.get_conductance`) are left out. `read_netlist` reads a text netlist line by line, so
+`convert_netlist` builds the binary file without holding the netlist in memory.
+It requires the optional dependency `numpy`.
+"""
+from array import array
+import mmap
+import os
+import re
+import struct
+import tempfile
+
+from resistor_grid.circuit import SparseCircuit
+from resistor_grid.laplacian import get_conductance
+from resistor_grid.numeric import ensure_numeric, get_laplacian, get_resistance
+from resistor_grid.polynomial import Polynomial
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MAGIC = b"RGCSR001"
+# magic, nodes, resistors, values, node1, node2
+HEADER = struct.Struct(u"<8sqqqqq")
+ALIGNMENT = 8
+MAX_NODES = 2 ** 32
+SUFFIXES = {u"f": 1e-15, u"p": 1e-12, u"n": 1e-9, u"u": 1e-6, u"m": 1e-3, u"k": 1e3,
+            u"meg": 1e6, u"g": 1e9, u"t": 1e12}
+NUMBER = re.compile(u"^[-+]?(?:[0-9]+\\.?[0-9]*|\\.[0-9]+)(?:[eE][-+]?[0-9]+)?")
+
+
+def get_resistance_value(value):
+    """
+    Returns the resistance `value` as a float, or None if it is an open circuit
+    :param value:
+    :return:
+    """
+    if get_conductance(value, exact=False) == 0:
+        return None
+    if isinstance(value, Polynomial):
+        value = value.coefficients[0]
+    return float(value)
+
+
+def get_layout(size, edge_count, value_count):
+    """
+    Returns the list of the tuples `(name, dtype, count, offset)` of the arrays of the file
+    :param size:
+    :param edge_count:
+    :param value_count:
+    :return:
+    """
+    layout = []
+    offset = HEADER.size
+    for name, dtype, count in ((u"indptr", numpy.int64, size + 1),
+                               (u"indices", numpy.uint32, edge_count),
+                               (u"value_ids", numpy.uint32, edge_count),
+                               (u"values", numpy.float64, value_count)):
+        layout.append((name, dtype, count, offset))
+        offset += count * numpy.dtype(dtype).itemsize
+        offset += -offset % ALIGNMENT
+    return layout
+
+
+def write_arrays(path, size, nodes1, nodes2, resistances, node1=0, node2=1):
+    """
+    Writes the circuit of `size` nodes whose resistors are given by the arrays `nodes1`, `nodes2`
+    and `resistances` (the infinite resistances are left out) in the file `path`.
+    The parallel resistors between the same nodes are merged.
+    :param path:
+    :param size:
+    :param nodes1:
+    :param nodes2:
+    :param resistances:
+    :param node1:
+    :param node2:
+    :return:
+    """
+    ensure_numeric()
+    if size > MAX_NODES:
+        raise Exception(u"Too many nodes: {}".format(size))
+    if not (0 <= node1 < size and 0 <= node2 < size) or node1 == node2:
+        raise Exception(u"Invalid terminals: {} and {}".format(node1, node2))
+
+    nodes1 = numpy.asarray(nodes1, dtype=numpy.int64)
+    nodes2 = numpy.asarray(nodes2, dtype=numpy.int64)
+    resistances = numpy.asarray(resistances, dtype=numpy.float64)
+    if numpy.any(nodes1 == nodes2):
+        raise Exception(u"Cannot set resistor for same node")
+    if numpy.any(resistances == 0):
+        raise Exception(u"Short circuits are not supported")
+    kept = numpy.isfinite(resistances)
+    lows = numpy.minimum(nodes1, nodes2)[kept]
+    highs = numpy.maximum(nodes1, nodes2)[kept]
+    resistances = resistances[kept]
+
+    # Sorted by (low, high): the CSR order
+    order = numpy.lexsort((highs, lows))
+    lows = lows[order]
+    highs = highs[order]
+    resistances = resistances[order]
+    first = numpy.ones(len(lows), dtype=bool)
+    first[1:] = (lows[1:] != lows[:-1]) | (highs[1:] != highs[:-1])
+    if not numpy.all(first):
+        groups = numpy.cumsum(first) - 1
+        resistances = 1.0 / numpy.bincount(groups, 1.0 / resistances)
+        lows = lows[first]
+        highs = highs[first]
+    values, value_ids = numpy.unique(resistances, return_inverse=True)
+    arrays = {
+        u"indptr": numpy.concatenate(([0], numpy.cumsum(numpy.bincount(lows, minlength=size)))),
+        u"indices": highs,
+        u"value_ids": value_ids,
+        u"values": values,
+    }
+
+    header = HEADER.pack(MAGIC, size, len(lows), len(values), node1, node2)
+    directory = os.path.dirname(os.path.abspath(path))
+    # Written then renamed, so a process mapping the file never sees a partial file
+    handle, temporary_path = tempfile.mkstemp(dir=directory, suffix=u".tmp")
+    with os.fdopen(handle, u"wb") as circuit_file:
+        circuit_file.write(header)
+        for name, dtype, _, offset in get_layout(size, len(lows), len(values)):
+            circuit_file.write(b"\0" * (offset - circuit_file.tell()))
+            circuit_file.write(numpy.ascontiguousarray(arrays[name], dtype=dtype).tobytes())
+    os.replace(temporary_path, path)
+
+
+def write_circuit(path, circuit, node1=0, node2=1):
+    """
+    Writes `circuit` and its terminals `node1` and `node2` in the file `path`
+    :param path:
+    :param circuit:
+    :param node1:
+    :param node2:
+    :return:
+    """
+    skip_default = get_conductance(circuit.default_value, exact=False) == 0
+    nodes1 = array(u"q")
+    nodes2 = array(u"q")
+    resistances = array(u"d")
+    # The grids share the same value objects between many resistors
+    known_resistances = {}
+    for edge_node1, edge_node2, value in circuit.get_edges(skip_default):
+        if id(value) not in known_resistances:
+            known_resistances[id(value)] = get_resistance_value(value)
+        resistance = known_resistances[id(value)]
+        if resistance is not None:
+            nodes1.append(edge_node1)
+            nodes2.append(edge_node2)
+            resistances.append(resistance)
+    write_arrays(path, circuit.size, numpy.frombuffer(nodes1, dtype=numpy.int64),
+                 numpy.frombuffer(nodes2, dtype=numpy.int64),
+                 numpy.frombuffer(resistances, dtype=numpy.float64), node1, node2)
+
+
+class MappedCircuit(object):
+    """
+    This class represents a circuit file mapped into memory. The arrays `indptr`, `indices`,
+    `value_ids` and `values` are read-only views of the file. It can be used as a sparse circuit
+    whose default value is None (no resistor), or turned into a `SparseCircuit` by `to_circuit`.
+    """
+    def __init__(self, path):
+        ensure_numeric()
+        self.path = path
+        with open(path, u"rb") as circuit_file:
+            header = circuit_file.read(HEADER.size)
+            if len(header) != HEADER.size or header[:len(MAGIC)] != MAGIC:
+                raise Exception(u"Not a circuit file: {}".format(path))
+            self.map = mmap.mmap(circuit_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        _, self.size, edge_count, value_count, self.node1, self.node2 = HEADER.unpack(header)
+        self.default_value = None
+        layout = get_layout(self.size, edge_count, value_count)
+        _, dtype, count, offset = layout[-1]
+        if len(self.map) < offset + count * numpy.dtype(dtype).itemsize:
+            self.map.close()
+            raise Exception(u"Truncated circuit file: {}".format(path))
+        for name, dtype, count, offset in layout:
+            setattr(self, name, numpy.frombuffer(self.map, dtype, count, offset))
+
+    def __getstate__(self):
+        return {u"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state[u"path"])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Releases the views and unmaps the file. The arrays obtained from this circuit (its
+        attributes or slices of them) must be released first: `mmap` raises a `BufferError`
+        while they are alive.
+        :return:
+        """
+        self.indptr = self.indices = self.value_ids = self.values = None
+        self.map.close()
+
+    def get_edge_count(self):
+        """
+        Returns the number of resistors
+        :return:
+        """
+        return len(self.indices)
+
+    def get_edge_arrays(self):
+        """
+        Returns the tuple of arrays `(nodes1, nodes2, resistances)` of the resistors
+        :return:
+        """
+        nodes1 = numpy.repeat(numpy.arange(self.size, dtype=numpy.int64),
+                              numpy.diff(self.indptr))
+        return nodes1, self.indices.astype(numpy.int64), self.values[self.value_ids]
+
+    def get_edges(self, skip_default=True):
+        """
+        Yields the tuple `(node1, node2, resistance)` for each resistor (node1 < node2), the
+        pairs without resistor are always skipped
+        :param skip_default:
+        :return:
+        """
+        values = self.values.tolist()
+        for node in range(self.size):
+            start = int(self.indptr[node])
+            end = int(self.indptr[node + 1])
+            for neighbour, value_id in zip(self.indices[start:end].tolist(),
+                                           self.value_ids[start:end].tolist()):
+                yield node, neighbour, values[value_id]
+
+    def get_conductance_matrix(self):
+        """
+        Returns the conductance matrix (Laplacian) of the circuit as a CSR matrix
+        :return:
+        """
+        nodes1, nodes2, _ = self.get_edge_arrays()
+        return get_laplacian(self.size, nodes1, nodes2, (1.0 / self.values)[self.value_ids])
+
+    def compute_resistance(self, method=u"direct", tolerance=1e-12):
+        """
+        Returns the equivalent resistance between the terminals of the file
+        (see `numeric.compute_resistance`)
+        :param method:
+        :param tolerance:
+        :return:
+        """
+        return get_resistance(self.get_conductance_matrix(), self.node1, self.node2, method,
+                              tolerance)
+
+    def to_circuit(self):
+        """
+        Returns the `SparseCircuit` of the file (the integer resistances are `int`s, so the exact
+        engines stay exact)
+        :return:
+        """
+        values = [int(value) if value.is_integer() else value for value in self.values.tolist()]
+        circuit = SparseCircuit(self.size)
+        indices = self.indices.tolist()
+        value_ids = self.value_ids.tolist()
+        for node in range(self.size):
+            for position in range(int(self.indptr[node]), int(self.indptr[node + 1])):
+                circuit.set(node, indices[position], values[value_ids[position]])
+        return circuit
+
+
+def parse_value(text):
+    """
+    Returns the value of the number `text`, with an optional SPICE suffix (such as "4.7k" or
+    "1meg")
+    :param text:
+    :return:
+    """
+    match = NUMBER.match(text)
+    if match is None:
+        raise Exception(u"Invalid value: {}".format(text))
+    suffix = text[match.end():].lower()
+    value = float(match.group())
+    if suffix.startswith(u"meg"):
+        return value * SUFFIXES[u"meg"]
+    return value * SUFFIXES.get(suffix[:1], 1.0)
+
+
+def read_netlist(netlist_file):
+    """
+    Yields the tuple `(name1, name2, resistance)` for each resistor of the text netlist
+    `netlist_file` (read line by line). The lines are either "node1 node2 value" or SPICE
+    resistors "Rname node1 node2 value"; the comments ("*" lines, after ";" or "#"), the blank
+    lines and the directives (".end") are skipped.
+    :param netlist_file:
+    :return:
+    """
+    for number, line in enumerate(netlist_file, 1):
+        line = line.split(u";", 1)[0].split(u"#", 1)[0].strip()
+        if not line or line[0] in u"*.":
+            continue
+        fields = line.split()
+        if len(fields) == 4 and fields[0][0] in u"rR":
+            fields = fields[1:]
+        if len(fields) != 3:
+            raise Exception(u"Invalid netlist line {}: {}".format(number, line))
+        yield fields[0], fields[1], parse_value(fields[2])
+
+
+def convert_netlist(netlist_path, path, terminal1=None, terminal2=None):
+    """
+    Writes the circuit of the text netlist `netlist_path` in the file `path` and returns the
+    number of nodes. The nodes are numbered in their order of appearance, the terminals are the
+    nodes named `terminal1` and `terminal2` (by default, the first two nodes).
+    :param netlist_path:
+    :param path:
+    :param terminal1:
+    :param terminal2:
+    :return:
+    """
+    ensure_numeric()
+    nodes = {}
+    nodes1 = array(u"q")
+    nodes2 = array(u"q")
+    resistances = array(u"d")
+    with open(netlist_path, u"r") as netlist_file:
+        for name1, name2, resistance in read_netlist(netlist_file):
+            nodes1.append(nodes.setdefault(name1, len(nodes)))
+            nodes2.append(nodes.setdefault(name2, len(nodes)))
+            resistances.append(resistance)
+
+    terminals = []
+    for terminal, default in ((terminal1, 0), (terminal2, 1)):
+        if terminal is None:
+            terminals.append(default)
+        elif terminal in nodes:
+            terminals.append(nodes[terminal])
+        else:
+            raise Exception(u"Unknown node: {}".format(terminal))
+    write_arrays(path, len(nodes), numpy.frombuffer(nodes1, dtype=numpy.int64),
+                 numpy.frombuffer(nodes2, dtype=numpy.int64),
+                 numpy.frombuffer(resistances, dtype=numpy.float64), *terminals)
+    return len(nodes)
+
+
+def write_netlist(netlist_file, circuit):
+    """
+    Writes the resistors of `circuit` in the text netlist `netlist_file` ("node1 node2 value"
+    lines)
+    :param netlist_file:
+    :param circuit:
+    :return:
+    """
+    skip_default = get_conductance(circuit.default_value, exact=False) == 0
+    for node1, node2, value in circuit.get_edges(skip_default):
+        resistance = get_resistance_value(value)
+        if resistance is not None:
+            netlist_file.write(u"{} {} {!r}\n".format(node1, node2, resistance))
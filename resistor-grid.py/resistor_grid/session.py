@@ -0,0 +1,132 @@
+# -*- coding: utf8 -*-
+
+"""
+This module computes the equivalent resistance of a circuit while some of its resistors change.
+A `SolveSession` factorizes the Laplacian of the circuit once. Changing the resistor between the
+nodes i and j adds the rank one term dg.(e_i - e_j).(e_i - e_j)^T to the Laplacian, where dg is
+the change of conductance. With k changed resistors, the Woodbury identity gives the resistance
+from the factorization, one solve per changed resistor and a k×k system:
+R = v^T.x - (U^T.x)^T.(C^-1 + U^T.Z)^-1.(U^T.x)
+where v = e_node1 - e_node2, x = L^-1.v, U = [e_i - e_j], Z = L^-1.U and C = diag(dg).
+"""
+from resistor_grid.laplacian import LaplacianSolver, get_conductance
+
+
+def solve_dense(mat, rhs):
+    """
+    Returns the solution of the small dense system `mat`.x = `rhs` (Gaussian elimination with
+    partial pivoting, `mat` and `rhs` are consumed)
+    :param mat:
+    :param rhs:
+    :return:
+    """
+    size = len(rhs)
+    for k in range(size):
+        line = max(range(k, size), key=lambda i: abs(mat[i][k]))
+        if mat[line][k] == 0:
+            raise Exception(u"Singular system")
+        mat[k], mat[line] = mat[line], mat[k]
+        rhs[k], rhs[line] = rhs[line], rhs[k]
+        for i in range(k + 1, size):
+            factor = mat[i][k] / mat[k][k]
+            if factor != 0:
+                for j in range(k, size):
+                    mat[i][j] -= factor * mat[k][j]
+                rhs[i] -= factor * rhs[k]
+    result = [0] * size
+    for k in reversed(range(size)):
+        value = rhs[k] - sum(mat[k][j] * result[j] for j in range(k + 1, size))
+        result[k] = value / mat[k][k]
+    return result
+
+
+class SolveSession(object):
+    """
+    This class keeps the factorization of the Laplacian of `circuit`, grounded at `node2`, and
+    updates the resistance between `node1` and `node2` when resistors are changed with `set`.
+    After `max_rank` changed resistors, the circuit is factorized again.
+    """
+    def __init__(self, circuit, node1=0, node2=1, exact=True, max_rank=32):
+        """
+        Factorizes the Laplacian of `circuit`
+        :param circuit:
+        :param node1:
+        :param node2:
+        :param exact:
+        :param max_rank:
+        """
+        if node1 == node2:
+            raise Exception(u"Cannot get resistance for same node")
+
+        self.circuit = circuit
+        self.node1 = node1
+        self.node2 = node2
+        self.exact = exact
+        self.max_rank = max_rank
+        self.solver = None
+        self.potentials = None
+        self.changes = None
+        self.factorize()
+
+    def factorize(self):
+        """
+        Factorizes the Laplacian of the current circuit and forgets the changes
+        :return:
+        """
+        self.solver = LaplacianSolver(self.circuit, ground=self.node2, exact=self.exact)
+        currents = [0] * self.circuit.size
+        currents[self.node1] = 1
+        self.potentials = self.solver.solve(currents)
+        # Maps each changed pair of nodes to the tuple (initial conductance, change, L^-1.u)
+        self.changes = {}
+
+    def set(self, node1, node2, value):
+        """
+        Sets the value of the resistor between `node1` and `node2` in the circuit and updates the
+        session
+        :param node1:
+        :param node2:
+        :param value:
+        :return:
+        """
+        key = (min(node1, node2), max(node1, node2))
+        if key in self.changes:
+            initial, _, solution = self.changes.pop(key)
+        else:
+            initial = get_conductance(self.circuit.get(node1, node2), self.exact)
+            solution = None
+        self.circuit.set(node1, node2, value)
+
+        change = get_conductance(value, self.exact) - initial
+        if change == 0:
+            return
+        if solution is None:
+            if len(self.changes) >= self.max_rank:
+                self.factorize()
+                return
+            currents = [0] * self.circuit.size
+            currents[key[0]] = 1
+            currents[key[1]] = -1
+            solution = self.solver.solve(currents)
+        self.changes[key] = (initial, change, solution)
+
+    def get_resistance(self):
+        """
+        Returns the equivalent resistance between `node1` and `node2` of the current circuit
+        :return:
+        """
+        resistance = self.potentials[self.node1]
+        if not self.changes:
+            return resistance
+
+        keys = list(self.changes)
+        # U^T.x, and C^-1 + U^T.Z
+        projections = [self.potentials[i] - self.potentials[j] for i, j in keys]
+        mat = []
+        for i, j in keys:
+            mat.append([solution[i] - solution[j] for _, _, solution in self.changes.values()])
+        for k, (_, change, _) in enumerate(self.changes.values()):
+            mat[k][k] += 1 / change
+        weights = solve_dense(mat, list(projections))
+        return resistance - sum(weight * projection
+                                for weight, projection in zip(weights, projections))
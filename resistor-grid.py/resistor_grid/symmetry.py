@@ -0,0 +1,198 @@
+# -*- coding: utf8 -*-
+
+"""
+This module uses the symmetries of a circuit to reduce the system solved by the nodal analysis.
+A symmetry is an involution `symmetry` of the nodes (a list: `symmetry[i]` is the image of the
+node `i`) which keeps the conductances and maps the two terminals to themselves:
+ - if it fixes both terminals, the potentials are symmetric: the nodes `i` and `symmetry[i]` are
+   at the same potential and are merged (no current flows between them),
+ - if it swaps the terminals, the potentials are antisymmetric: the fixed nodes are at the
+   middle potential (the ground) and only one node of each pair is kept.
+In both cases about half of the nodes remain. The reduced matrix is the projection of the
+Laplacian on the symmetric or antisymmetric potentials, it is factorized by `LaplacianSolver`.
+
+The symmetries of the grids of `create_grid` are the reflections of the rectangle (and the
+transpositions of a square), `get_grid_symmetries` lists them as candidates for `find_symmetry`.
+"""
+from resistor_grid.circuit import get_knight_swaps, get_swapped_nodes
+from resistor_grid.laplacian import LaplacianSolver
+from resistor_grid.reduction import get_graph
+
+
+def get_grid_symmetries(width, height, swaps=()):
+    """
+    Returns the symmetries of the grid of size `width`×`height` whose nodes `swaps` (a list of
+    pairs of nodes) were swapped after its creation
+    :param width:
+    :param height:
+    :param swaps:
+    :return:
+    """
+    size = width * height
+    node_of_position = get_swapped_nodes(size, swaps)
+    position_of_node = [0] * size
+    for position, node in enumerate(node_of_position):
+        position_of_node[node] = position
+
+    transforms = [
+        lambda x, y: (width - 1 - x, y),
+        lambda x, y: (x, height - 1 - y),
+        lambda x, y: (width - 1 - x, height - 1 - y),
+    ]
+    if width == height:
+        transforms.append(lambda x, y: (y, x))
+        transforms.append(lambda x, y: (width - 1 - y, width - 1 - x))
+
+    symmetries = []
+    for transform in transforms:
+        symmetry = []
+        for node in range(size):
+            x, y = transform(position_of_node[node] % width, position_of_node[node] // width)
+            symmetry.append(node_of_position[y * width + x])
+        symmetries.append(symmetry)
+    return symmetries
+
+
+def get_knight_symmetries(width):
+    """
+    Returns the symmetries of the grid of `create_knight_grid`
+    :param width:
+    :return:
+    """
+    return get_grid_symmetries(width, width + 1, get_knight_swaps(width))
+
+
+def is_symmetry(graph, symmetry, node1, node2):
+    """
+    Returns a boolean indicating whether or not `symmetry` is an involution of the nodes keeping
+    the conductances of `graph` (see `reduction.get_graph`) and the pair of terminals
+    :param graph:
+    :param symmetry:
+    :param node1:
+    :param node2:
+    :return:
+    """
+    if len(symmetry) != len(graph):
+        return False
+    if set((symmetry[node1], symmetry[node2])) != set((node1, node2)):
+        return False
+    for node, neighbours in enumerate(graph):
+        image = symmetry[node]
+        if symmetry[image] != node or len(graph[image]) != len(neighbours):
+            return False
+        image_neighbours = graph[image]
+        for neighbour, conductance in neighbours.items():
+            if image_neighbours.get(symmetry[neighbour]) != conductance:
+                return False
+    return True
+
+
+def find_symmetry(graph, node1, node2, candidates):
+    """
+    Returns the first symmetry of `candidates` valid for `graph` and the terminals, or None
+    :param graph:
+    :param node1:
+    :param node2:
+    :param candidates:
+    :return:
+    """
+    for symmetry in candidates:
+        if is_symmetry(graph, symmetry, node1, node2):
+            return symmetry
+    return None
+
+
+def get_quotient(graph, symmetry, node1, node2):
+    """
+    Returns the tuple `(rows, classes, coefficients, ground)` of the reduced system.
+    The potential of the node `i` is `coefficients[i]` times the potential of the class
+    `classes[i]` of the reduced system `rows`, which is grounded at `ground`.
+    :param graph:
+    :param symmetry:
+    :param node1:
+    :param node2:
+    :return:
+    """
+    size = len(graph)
+    antisymmetric = symmetry[node1] != node1
+    classes = [None] * size
+    coefficients = [1] * size
+    count = 0
+    for node in [node1] + list(range(size)):
+        if classes[node] is not None:
+            continue
+        image = symmetry[node]
+        if antisymmetric and image == node:
+            coefficients[node] = 0
+            continue
+        classes[node] = count
+        classes[image] = count
+        if antisymmetric:
+            coefficients[image] = -1
+        count += 1
+
+    if antisymmetric:
+        # The fixed nodes are merged into the ground
+        ground = count
+        count += 1
+        for node in range(size):
+            if coefficients[node] == 0:
+                classes[node] = ground
+    else:
+        ground = classes[node2]
+
+    rows = [{} for _ in range(count)]
+    for node, neighbours in enumerate(graph):
+        for neighbour, conductance in neighbours.items():
+            if neighbour < node:
+                continue
+            # The projection of the edge on the reduced potentials
+            projection = {}
+            for other, coefficient in ((node, 1), (neighbour, -1)):
+                if coefficients[other] != 0:
+                    index = classes[other]
+                    projection[index] = projection.get(index, 0) + coefficient * \
+                        coefficients[other]
+            for index1, value1 in projection.items():
+                if value1 == 0:
+                    continue
+                row = rows[index1]
+                for index2, value2 in projection.items():
+                    if value2 != 0:
+                        row[index2] = row.get(index2, 0) + conductance * value1 * value2
+    return rows, classes, coefficients, ground
+
+
+def compute_resistance(circuit, node1=0, node2=1, symmetry=None, candidates=(), exact=True):
+    """
+    Returns the equivalent resistance between the nodes `node1` and `node2` of `circuit`.
+    The system is reduced with `symmetry`, or with the first valid symmetry of `candidates`
+    (such as `get_grid_symmetries`). Without valid symmetry, the whole circuit is solved.
+    :param circuit:
+    :param node1:
+    :param node2:
+    :param symmetry:
+    :param candidates:
+    :param exact:
+    :return:
+    """
+    if node1 == node2:
+        raise Exception(u"Cannot get resistance for same node")
+
+    graph = get_graph(circuit, exact)
+    if symmetry is None:
+        symmetry = find_symmetry(graph, node1, node2, candidates)
+        if symmetry is None:
+            return LaplacianSolver(circuit, ground=node2, exact=exact).get_resistance(
+                node1, node2)
+    elif not is_symmetry(graph, symmetry, node1, node2):
+        raise Exception(u"Invalid symmetry")
+
+    rows, classes, coefficients, ground = get_quotient(graph, symmetry, node1, node2)
+    solver = LaplacianSolver(None, ground=ground, rows=rows)
+    currents = [0] * len(rows)
+    currents[classes[node1]] += coefficients[node1]
+    currents[classes[node2]] -= coefficients[node2]
+    potentials = solver.solve(currents)
+    return coefficients[node1] * potentials[classes[node1]] - \
+        coefficients[node2] * potentials[classes[node2]]
@@ -0,0 +1,73 @@
+# -*- coding: utf8 -*-
+
+"""
+Unit-test for the ac module
+"""
+
+import math
+import unittest
+
+from resistor_grid.ac import CAPACITOR, INDUCTOR, RESISTOR, ACAnalysis, Element, \
+    compute_impedances, numpy
+from resistor_grid.circuit import Circuit, create_knight_grid
+
+
+@unittest.skipIf(numpy is None, u"numpy and scipy are not installed")
+class TestAC(unittest.TestCase):
+    """
+    The TestCase for the ac module
+    """
+
+    def test_element(self):
+        """
+        Test the `Element` class
+        :return:
+        """
+
+        self.assertEqual(u"L=0.001", str(Element(INDUCTOR, 0.001)))
+        self.assertRaises(Exception, Element, u"X", 1)
+
+    def test_rlc(self):
+        """
+        Test the impedances of series and parallel RLC circuits with both methods
+        :return:
+        """
+
+        resonance = 1.0 / (2 * math.pi * math.sqrt(0.1 * 1e-4))
+        frequencies = numpy.array([10.0, resonance, 1e4])
+        pulsations = 2 * math.pi * frequencies
+        circuit = Circuit(4)
+        circuit.set(0, 2, Element(RESISTOR, 50.0))
+        circuit.set(2, 3, Element(INDUCTOR, 0.1))
+        circuit.set(3, 1, Element(CAPACITOR, 1e-4))
+        expected = 50.0 + 1j * pulsations * 0.1 + 1.0 / (1j * pulsations * 1e-4)
+        for method in (u"dense", u"sparse"):
+            sweep = compute_impedances(circuit, frequencies, method=method)
+            self.assertTrue(numpy.allclose(expected, sweep.impedances))
+        # At the resonance, the series circuit is the resistor only
+        self.assertAlmostEqual(50.0, sweep.impedances[1].real)
+        self.assertAlmostEqual(0.0, sweep.impedances[1].imag)
+        self.assertGreater(sweep.get_points_per_second(), 0)
+
+        circuit = Circuit(2)
+        circuit.set(0, 1, Element(CAPACITOR, 1e-6))
+        sweep = compute_impedances(circuit, [1e3])
+        self.assertAlmostEqual(-1.0 / (2 * math.pi * 1e-3), sweep.impedances[0].imag)
+        self.assertRaises(Exception, compute_impedances, circuit, [1e3], 0, 0)
+        self.assertRaises(Exception, compute_impedances, circuit, [1e3], method=u"unknown")
+
+    def test_resistor_grid(self):
+        """
+        Test that a grid of resistors has the real impedance of the nodal analysis
+        :return:
+        """
+
+        analysis = ACAnalysis(create_knight_grid(3, open_value=None))
+        self.assertEqual(11, analysis.size)
+        for method in (u"dense", u"sparse"):
+            impedances = analysis.sweep(numpy.logspace(0, 6, 5), method).impedances
+            self.assertTrue(numpy.allclose(73.0 / 69.0, impedances))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# -*- coding: utf8 -*-
+
+"""
+Unit-test for the cache module
+"""
+
+from fractions import Fraction
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from resistor_grid.cache import ResultCache, encode_value, get_circuit_key
+from resistor_grid.circuit import Circuit, SparseCircuit, create_knight_grid
+from resistor_grid.polynomial import Polynomial
+
+
+class TestCache(unittest.TestCase):
+    """
+    The TestCase for the cache module
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_encode_value(self):
+        """
+        Test the `encode_value` function
+        :return:
+        """
+
+        self.assertEqual(u"none", encode_value(None))
+        self.assertEqual(encode_value(Fraction(2)), encode_value(2))
+        self.assertEqual(u"p(q1,q1/2)", encode_value(Polynomial([1, Fraction(1, 2)])))
+        self.assertNotEqual(encode_value(2.0), encode_value(2))
+
+    def test_circuit_key(self):
+        """
+        Test that the key only depends on the problem
+        :return:
+        """
+
+        dense = Circuit(4)
+        sparse = SparseCircuit(4)
+        for circuit in (dense, sparse):
+            circuit.set(0, 2, 1)
+            circuit.set(2, 3, Fraction(1, 2))
+        self.assertEqual(get_circuit_key(dense, 0, 3), get_circuit_key(sparse, 0, 3))
+        self.assertNotEqual(get_circuit_key(dense, 0, 3), get_circuit_key(dense, 0, 2))
+        self.assertNotEqual(get_circuit_key(dense, 0, 3), get_circuit_key(dense, 0, 3, u"other"))
+        key = get_circuit_key(sparse, 0, 3)
+        sparse.swap_nodes(1, 3)
+        self.assertEqual(key, get_circuit_key(sparse, 0, 1))
+        self.assertEqual(get_circuit_key(create_knight_grid(3)),
+                         get_circuit_key(create_knight_grid(3)))
+
+    def test_result_cache(self):
+        """
+        Test the storage and the eviction of the entries
+        :return:
+        """
+
+        cache = ResultCache(os.path.join(self.directory, u"cache"))
+        self.assertEqual(None, cache.get(u"a"))
+        cache.put(u"a", {u"resistance": Fraction(73, 69)})
+        cache.update(u"a", determinant=Polynomial([1, 2]))
+        entry = cache.get(u"a")
+        self.assertEqual(Fraction(73, 69), entry[u"resistance"])
+        self.assertEqual((1, 2), entry[u"determinant"].coefficients)
+
+        cache.put(u"b", {u"resistance": Fraction(73, 69)})
+        cache.max_bytes = os.path.getsize(cache.get_path(u"a")) + \
+            os.path.getsize(cache.get_path(u"b"))
+        os.utime(cache.get_path(u"a"), (0, 0))
+        cache.put(u"c", {u"resistance": Fraction(73, 69)})
+        self.assertEqual(None, cache.get(u"a"))
+        self.assertNotEqual(None, cache.get(u"b"))
+        self.assertNotEqual(None, cache.get(u"c"))
+
+        # The entry is evicted by another process after it was read
+        with mock.patch(u"os.utime", side_effect=FileNotFoundError):
+            self.assertNotEqual(None, cache.get(u"c"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,7 +6,8 @@ Unit-test for the Circuit class
 
 import unittest
 
-from resistor_grid.circuit import Circuit
+from resistor_grid.circuit import Circuit, SparseCircuit, create_grid, get_grid_offsets, \
+    get_label
 
 
 class TestPolynomial(unittest.TestCase):
@@ -67,6 +68,75 @@ class TestPolynomial(unittest.TestCase):
         self.assertEqual(1, circuit.get(3, 1))
         self.assertEqual(1, circuit.get(4, 1))
 
+    def test_sparse_swap_nodes(self):
+        """
+        Test that the `swap_nodes` method of SparseCircuit matches the one of Circuit
+        :return:
+        """
+
+        dense = Circuit(6, default_value=0)
+        sparse = SparseCircuit(6, default_value=0)
+        for circuit in (dense, sparse):
+            circuit.set(0, 1, 1)
+            circuit.set(0, 2, 2)
+            circuit.set(1, 3, 3)
+            circuit.set(2, 3, 4)
+            circuit.set(2, 4, 5)
+            circuit.set(3, 5, 6)
+            circuit.set(4, 5, 7)
+            circuit.swap_nodes(1, 5)
+            circuit.swap_nodes(0, 2)
+        for i in range(6):
+            for j in range(i):
+                self.assertEqual(dense.get(i, j), sparse.get(i, j))
+        self.assertEqual(7, len(list(sparse.get_edges(skip_default=True))))
+        self.assertEqual(list(dense.get_edges()), list(sparse.get_edges()))
+
+    def test_sparse_set(self):
+        """
+        Test the `set` and `ensure_complete` methods of SparseCircuit
+        :return:
+        """
+
+        circuit = SparseCircuit(3)
+        circuit.set(0, 1, 1)
+        circuit.set(1, 2, 2)
+        self.assertEqual([{1: 1}, {0: 1, 2: 2}, {1: 2}], circuit.resistors)
+        self.assertRaises(Exception, circuit.ensure_complete)
+        circuit.set(1, 2, None)
+        self.assertEqual([{1: 1}, {0: 1}, {}], circuit.resistors)
+
+    def test_create_grid(self):
+        """
+        Test that `create_grid` only stores the resistors of the grid
+        :return:
+        """
+
+        circuit = create_grid(3, 2, open_value=None)
+        edges = [(node1, node2) for node1, node2, _ in circuit.get_edges(skip_default=True)]
+        self.assertEqual([(0, 1), (0, 3), (1, 2), (1, 4), (2, 5), (3, 4), (4, 5)], sorted(edges))
+        self.assertEqual(None, circuit.get(0, 4))
+        self.assertEqual((1,), circuit.get(4, 1).coefficients)
+
+    def test_grid_offsets(self):
+        """
+        Test that `get_grid_offsets` stays inside of the grid
+        :return:
+        """
+
+        self.assertEqual([(1, 0, 1), (0, 1, 3), (1, 1, 4)], get_grid_offsets(3, 2, 0, 1))
+        self.assertEqual(24, len(get_grid_offsets(5, 5, 12, 2)))
+        self.assertEqual((-2, -2, 0), get_grid_offsets(5, 5, 12, 2)[0])
+
+    def test_label(self):
+        """
+        Test that `get_label` matches the swaps of the terminals into the nodes 0 and 1
+        :return:
+        """
+
+        self.assertEqual([2, 3, 0, 1], [get_label(node, 2, 3) for node in range(4)])
+        self.assertEqual([1, 2, 0], [get_label(node, 2, 0) for node in range(3)])
+
 
 if __name__ == '__main__':
     unittest.main()
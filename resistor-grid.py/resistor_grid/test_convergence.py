@@ -0,0 +1,72 @@
+# -*- coding: utf8 -*-
+
+"""
+Unit-test for the convergence module
+"""
+
+from fractions import Fraction
+import math
+import unittest
+
+from resistor_grid.convergence import Extrapolation, aitken, extrapolate_resistance, richardson
+
+
+class TestConvergence(unittest.TestCase):
+    """
+    The TestCase for the convergence module
+    """
+
+    def test_richardson(self):
+        """
+        Test that the `richardson` function eliminates the terms of the series exactly
+        :return:
+        """
+
+        points = [(size, 2 + Fraction(3, size ** 2) - Fraction(5, size ** 3)) for size in (4, 6, 8)]
+        self.assertEqual(2, richardson(points, [2, 3]))
+        self.assertAlmostEqual(2.0, richardson([(size, float(value)) for size, value in points],
+                                               [2, 3]))
+        self.assertRaises(Exception, richardson, points, [2])
+        self.assertRaises(Exception, richardson, [(4, 1), (4, 2)], [2])
+
+    def test_aitken(self):
+        """
+        Test the `aitken` function on a geometric sequence
+        :return:
+        """
+
+        self.assertEqual(1, aitken([Fraction(3, 2), Fraction(5, 4), Fraction(9, 8)]))
+        self.assertEqual(3, aitken([1, 3, 3, 3]))
+        self.assertRaises(Exception, aitken, [1, 2])
+
+    def test_extrapolation(self):
+        """
+        Test the `Extrapolation` class on an exact series
+        :return:
+        """
+
+        extrapolation = Extrapolation(terms=2)
+        for size in (2, 3, 4, 5):
+            extrapolation.add(size, 1 + Fraction(1, size ** 2) + Fraction(1, size ** 3))
+        self.assertEqual(1, extrapolation.value)
+        self.assertEqual([2, 3, 4, 5], extrapolation.sizes)
+        points = [(size, 1 + Fraction(1, size ** 2) + Fraction(1, size ** 3)) for size in (4, 5)]
+        self.assertEqual(abs(1 - richardson(points, [2])), extrapolation.error)
+
+    def test_knight_grid(self):
+        """
+        Test that the extrapolation of the knight grids is closer to the limit (4/π - 1/2) than
+        the largest grid and that the error estimate bounds the actual error
+        :return:
+        """
+
+        limit = 4 / math.pi - 0.5
+        extrapolation = extrapolate_resistance(tolerance=1e-4, max_size=14)
+        self.assertLess(extrapolation.error, 1e-4)
+        self.assertLessEqual(abs(float(extrapolation.value) - limit), extrapolation.error)
+        self.assertLess(abs(float(extrapolation.value) - limit),
+                        1e-3 * abs(float(extrapolation.values[-1]) - limit))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# -*- coding: utf8 -*-
+
+"""
+Unit-test for the instrumentation module
+"""
+
+import io
+import json
+import unittest
+
+from resistor_grid.instrumentation import JsonLinesSink, ProgressMonitor, create_monitor, \
+    measure_rows, measure_value
+from resistor_grid.matrix import Matrix
+from resistor_grid.polynomial import Polynomial
+
+
+class TestInstrumentation(unittest.TestCase):
+    """
+    The TestCase for the instrumentation module
+    """
+
+    def test_measure(self):
+        """
+        Test the `measure_value` and `measure_rows` functions
+        :return:
+        """
+
+        self.assertEqual((3, 0), measure_value(-5))
+        self.assertEqual((4, 2), measure_value(Polynomial([1, 0, -9])))
+        self.assertEqual((0, -1), measure_value(Polynomial([])))
+        self.assertEqual((4, 2), measure_rows([[1, Polynomial([1, 0, -9])], {3: 2}]))
+
+    def test_create_monitor(self):
+        """
+        Test the `create_monitor` function
+        :return:
+        """
+
+        self.assertEqual(None, create_monitor())
+        self.assertEqual(1, len(create_monitor(log_progress=True).callbacks))
+        self.assertEqual(2, len(create_monitor(progress=[print, print]).callbacks))
+        monitor = ProgressMonitor([print])
+        self.assertIs(monitor, create_monitor(progress=monitor))
+        for _ in range(2):
+            self.assertEqual(2, len(create_monitor(True, monitor).callbacks))
+        self.assertEqual(1, len(monitor.callbacks))
+
+    def test_measure_interval(self):
+        """
+        Test that the coefficients are measured on a fraction of the steps by default
+        :return:
+        """
+
+        reports = []
+        monitor = ProgressMonitor([reports.append])
+        for step in range(64):
+            monitor.on_step(step, 64, 1, 0, rows=[[1]])
+        self.assertEqual(16, sum(report.max_bit_length is not None for report in reports))
+        reports = []
+        monitor = ProgressMonitor([reports.append], measure_interval=None)
+        monitor.on_step(0, 64, 1, 0, rows=[[1]])
+        self.assertEqual(None, reports[0].max_bit_length)
+
+    def test_det_reports(self):
+        """
+        Test the reports of the determinant computations
+        :return:
+        """
+
+        reports = []
+        mat = Matrix([[2, 1, 3], [4, 5, 6], [7, 8, 10]])
+        self.assertEqual(mat.compute_det(), mat.compute_det(progress=reports.append))
+        self.assertEqual([0, 1], [report.step for report in reports])
+        self.assertEqual([8, 2], [report.multiplies for report in reports])
+        self.assertEqual([0, 1], [report.divides for report in reports])
+        self.assertEqual(0.0, reports[1].eta)
+        self.assertEqual(4, reports[0].max_bit_length)
+
+        reports = []
+        mat.compute_sparse_det(progress=reports.append)
+        self.assertEqual([0, 1, 2], [report.step for report in reports])
+
+    def test_json_lines(self):
+        """
+        Test the `JsonLinesSink` class
+        :return:
+        """
+
+        stream = io.StringIO()
+        Matrix([[1, 2], [3, 4]]).compute_det(progress=JsonLinesSink(stream))
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(1, len(lines))
+        report = json.loads(lines[0])
+        self.assertEqual(0, report[u"step"])
+        self.assertEqual(1, report[u"steps"])
+        self.assertEqual(2, report[u"multiplies"])
+
+
+if __name__ == '__main__':
+    unittest.main()
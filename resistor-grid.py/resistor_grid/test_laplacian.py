@@ -0,0 +1,95 @@
+# -*- coding: utf8 -*-
+
+"""
+Unit-test for the laplacian module
+"""
+
+from fractions import Fraction
+import unittest
+
+from resistor_grid.circuit import Circuit, create_grid, create_knight_grid, get_grid_offsets
+from resistor_grid.laplacian import LaplacianSolver, compute_resistance, compute_resistances, \
+    get_conductance
+from resistor_grid.polynomial import Polynomial
+
+
+class TestLaplacian(unittest.TestCase):
+    """
+    The TestCase for the laplacian module
+    """
+
+    def test_get_conductance(self):
+        """
+        Test the `get_conductance` function
+        :return:
+        """
+
+        self.assertEqual(0, get_conductance(None))
+        self.assertEqual(Fraction(1, 2), get_conductance(2))
+        self.assertEqual(Fraction(1, 3), get_conductance(Polynomial([3])))
+        self.assertEqual(0, get_conductance(Polynomial([0, 1])))
+        self.assertEqual(0, get_conductance(Polynomial([2, 0, 1])))
+        self.assertEqual(0.5, get_conductance(2, exact=False))
+        self.assertRaises(Exception, get_conductance, 0)
+
+    def test_compute_resistance(self):
+        """
+        Test the `compute_resistance` function on series and parallel resistors
+        :return:
+        """
+
+        circuit = Circuit(3)
+        circuit.set(0, 2, 1)
+        circuit.set(2, 1, 2)
+        self.assertEqual(3, compute_resistance(circuit))
+        circuit.set(0, 1, 6)
+        self.assertEqual(2, compute_resistance(circuit))
+        self.assertEqual(Fraction(14, 9), compute_resistance(circuit, 1, 2))
+        self.assertAlmostEqual(14.0 / 9.0, compute_resistance(circuit, 1, 2, exact=False))
+
+    def test_knight_grid(self):
+        """
+        Test the resistance of the knight grid, it must match the value of the mesh matrix
+        :return:
+        """
+
+        circuit = create_knight_grid(3, open_value=None)
+        self.assertEqual(Fraction(2555, 2415), compute_resistance(circuit))
+        self.assertEqual(Fraction(2555, 2415), compute_resistance(create_knight_grid(3)))
+
+        solver = LaplacianSolver(circuit, ground=5)
+        self.assertEqual(Fraction(2555, 2415), solver.get_resistance(0, 1))
+        self.assertEqual(solver.get_resistance(3, 7), solver.get_resistance(7, 3))
+
+    def test_compute_resistances(self):
+        """
+        Test that the `compute_resistances` function matches `compute_resistance` for each pair
+        :return:
+        """
+
+        circuit = create_grid(5, 5, open_value=None)
+        pairs = [(12, node) for _, _, node in get_grid_offsets(5, 5, 12, 1)] + [(0, 24), (3, 3)]
+        self.assertRaises(Exception, compute_resistances, circuit, pairs)
+        pairs.pop()
+        self.assertEqual([compute_resistance(circuit, node1, node2) for node1, node2 in pairs],
+                         compute_resistances(circuit, pairs))
+        self.assertEqual([compute_resistance(circuit, 7, 12)],
+                         LaplacianSolver(circuit, 7).get_resistances([(7, 12)]))
+        self.assertEqual([], compute_resistances(circuit, []))
+
+    def test_disconnected(self):
+        """
+        Test that the nodes disconnected from the terminals are ignored, and detected when they
+        are terminals
+        :return:
+        """
+
+        circuit = Circuit(3)
+        circuit.set(0, 1, 1)
+        self.assertEqual(1, compute_resistance(circuit))
+        self.assertEqual([1], compute_resistances(circuit, [(1, 0)]))
+        self.assertRaises(Exception, compute_resistance, circuit, 0, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
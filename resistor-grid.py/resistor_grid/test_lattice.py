@@ -0,0 +1,71 @@
+# -*- coding: utf8 -*-
+
+"""
+Unit-test for the lattice module
+"""
+
+from fractions import Fraction
+import math
+import unittest
+
+from resistor_grid import laplacian
+from resistor_grid.circuit import create_grid
+from resistor_grid.lattice import LatticeResistances, compute_resistance, format_resistance, \
+    get_exact_resistance, get_pi
+
+
+class TestLattice(unittest.TestCase):
+    """
+    The TestCase for the lattice module
+    """
+
+    def test_exact_resistance(self):
+        """
+        Test the `get_exact_resistance` function against the known values
+        :return:
+        """
+
+        self.assertEqual((0, 0), get_exact_resistance(0, 0))
+        self.assertEqual((Fraction(1, 2), 0), get_exact_resistance(1, 0))
+        self.assertEqual((0, 2), get_exact_resistance(-1, 1))
+        self.assertEqual((2, -4), get_exact_resistance(0, 2))
+        self.assertEqual((Fraction(-1, 2), 4), get_exact_resistance(2, -1))
+        self.assertEqual((0, Fraction(8, 3)), get_exact_resistance(2, 2))
+        self.assertEqual((Fraction(17, 2), -24), get_exact_resistance(3, 0))
+        self.assertEqual(u"-1/2 + 4/π", format_resistance(get_exact_resistance(1, 2)))
+        self.assertEqual(u"1/2", format_resistance(get_exact_resistance(1, 0)))
+
+    def test_compute_resistance(self):
+        """
+        Test the `compute_resistance` function, including far offsets where the exact terms
+        cancel each other
+        :return:
+        """
+
+        self.assertAlmostEqual(4 / math.pi - 0.5, compute_resistance(2, 1), places=15)
+        self.assertAlmostEqual(math.pi, float(get_pi(20)), places=15)
+        table = LatticeResistances()
+        # Asymptotic expansion of the lattice Green's function
+        for dx, dy in ((40, 0), (30, 30)):
+            distance = math.hypot(dx, dy)
+            expected = (2 * math.log(distance) + 2 * 0.5772156649015329 + math.log(8)) / (
+                2 * math.pi)
+            self.assertAlmostEqual(expected, table.get_resistance(dx, dy), places=4)
+        self.assertEqual(41, len(table.lines))
+
+    def test_finite_grid(self):
+        """
+        Test that the center of a large finite grid is close to the infinite grid
+        :return:
+        """
+
+        circuit = create_grid(21, 21, open_value=None)
+        center = 10 * 21 + 10
+        for dx, dy in ((1, 0), (1, 1), (2, 1)):
+            resistance = laplacian.compute_resistance(circuit, center, center + dy * 21 + dx,
+                                                      exact=False)
+            self.assertAlmostEqual(compute_resistance(dx, dy), resistance, delta=1e-2)
+
+
+if __name__ == '__main__':
+    unittest.main()
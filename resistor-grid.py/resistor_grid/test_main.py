@@ -0,0 +1,124 @@
+# -*- coding: utf8 -*-
+
+"""
+Unit-test for the main module
+"""
+
+import argparse
+from fractions import Fraction
+import io
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from resistor_grid.circuit import create_grid, create_knight_grid
+from resistor_grid.main import compute_resistance, main, parse_range
+
+
+class TestMain(unittest.TestCase):
+    """
+    The TestCase for the main module
+    """
+
+    def run_main(self, argv):
+        """
+        Runs the command line interface with the arguments `argv` and returns its output
+        :param argv:
+        :return:
+        """
+        with mock.patch(u"sys.stdout", new_callable=io.StringIO) as stdout:
+            self.assertEqual(0, main(argv))
+        return stdout.getvalue()
+
+    def test_parse_range(self):
+        """
+        Test the `parse_range` function
+        :return:
+        """
+
+        self.assertEqual([3], list(parse_range(u"3")))
+        self.assertEqual([2, 3, 4], list(parse_range(u"2:4")))
+        self.assertEqual([1, 3, 5], list(parse_range(u"1:5:2")))
+        self.assertRaises(argparse.ArgumentTypeError, parse_range, u"3:2")
+        self.assertRaises(argparse.ArgumentTypeError, parse_range, u"1:5:0")
+
+    def test_compute_resistance(self):
+        """
+        Test that all the engines compute the same resistances
+        :return:
+        """
+
+        self.assertEqual(Fraction(73, 69), compute_resistance(create_knight_grid(3)))
+        for engine in (u"reduction", u"modular", u"determinant"):
+            self.assertEqual(Fraction(7, 5),
+                             compute_resistance(create_grid(3, 2), 0, 5, engine))
+            self.assertEqual(Fraction(73, 69),
+                             compute_resistance(create_knight_grid(3), 0, 1, engine))
+        self.assertRaises(Exception, compute_resistance, create_grid(2, 2), 0, 1, u"unknown")
+
+        # The circuit of the caller is not modified
+        circuit = create_grid(3, 2)
+        self.assertEqual(Fraction(7, 5), compute_resistance(circuit, 0, 5, u"determinant"))
+        self.assertEqual(Fraction(11, 15), compute_resistance(circuit, 0, 1, u"determinant"))
+        self.assertEqual(Fraction(11, 15), compute_resistance(circuit, 0, 1))
+
+    def test_sweep(self):
+        """
+        Test a sweep of knight grids streamed as JSON lines
+        :return:
+        """
+
+        output = self.run_main([u"--sweep", u"2:3", u"--format", u"json"])
+        results = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual([2, 3], [result[u"width"] for result in results])
+        self.assertEqual([u"7/5", u"73/69"], [result[u"resistance"] for result in results])
+
+    def test_terminals(self):
+        """
+        Test a rectangular grid with terminals given by their positions, as CSV
+        :return:
+        """
+
+        output = self.run_main([u"--width", u"3", u"--height", u"2", u"--terminals", u"0,0",
+                                u"2,1", u"--format", u"csv"])
+        lines = output.splitlines()
+        self.assertEqual(2, len(lines))
+        self.assertTrue(lines[1].startswith(u"3,2,0,5,laplacian,7/5,1.4,"))
+
+    def test_usage_errors(self):
+        """
+        Test that the invalid arguments give usage errors
+        :return:
+        """
+
+        for argv in ([u"--height", u"2"], [u"--height", u"2", u"--terminals", u"0,0", u"3,1"],
+                     [u"--height", u"2", u"--terminals", u"0,0", u"0,2"], [u"--sweep", u"3:2"]):
+            with mock.patch(u"sys.stderr", new_callable=io.StringIO) as stderr:
+                with self.assertRaises(SystemExit) as context:
+                    main(argv)
+            self.assertEqual(2, context.exception.code)
+            self.assertIn(u"usage:", stderr.getvalue())
+
+    def test_cache(self):
+        """
+        Test that the results are reused from the cache
+        :return:
+        """
+
+        directory = tempfile.mkdtemp()
+        try:
+            argv = [u"--sweep", u"2:3", u"--format", u"json", u"--cache", directory]
+            first = [json.loads(line) for line in self.run_main(argv).splitlines()]
+            with mock.patch(u"resistor_grid.main.compute_resistance") as compute:
+                second = [json.loads(line) for line in self.run_main(argv).splitlines()]
+            compute.assert_not_called()
+            self.assertEqual([result[u"resistance"] for result in first],
+                             [result[u"resistance"] for result in second])
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == u"__main__":
+    unittest.main()
@@ -4,9 +4,15 @@
 Unit-test for the Matrix class
 """
 
+import os
+import shutil
+import tempfile
 import unittest
 
-from resistor_grid.matrix import Matrix
+from resistor_grid.circuit import create_knight_grid
+from resistor_grid.matrix import Checkpoint, Matrix, eliminate, \
+    permutation_parity, resume_det
+from resistor_grid.polynomial import Polynomial
 
 
 class TestMatrix(unittest.TestCase):
@@ -27,6 +33,7 @@ class TestMatrix(unittest.TestCase):
 
         mat = Matrix([[1, 2], [3, 4]])
         self.assertEqual(((1, 2), (3, 4)), mat.coefficients)
+        self.assertIs(mat.coefficients, mat.coefficients)
         self.assertEqual(1, mat.get_coefficient(0, 0))
         self.assertEqual(2, mat.get_coefficient(0, 1))
         self.assertEqual(3, mat.get_coefficient(1, 0))
@@ -41,6 +48,105 @@ class TestMatrix(unittest.TestCase):
         self.assertEqual(1, Matrix([[1]]).compute_det())
         self.assertEqual(-2, Matrix([[1, 2], [3, 4]]).compute_det())
 
+    def test_det_and_minor(self):
+        """
+        Test the .compute_det_and_minor method
+        :return:
+        """
+
+        mat = Matrix([
+            [2, 1, 3],
+            [4, 5, 6],
+            [7, 8, 10]
+        ])
+        for line in range(3):
+            for column in range(3):
+                self.assertEqual(
+                    (mat.compute_det(), mat.sub_matrix(line, column).compute_det()),
+                    mat.compute_det_and_minor(line, column)
+                )
+
+        mat = create_knight_grid(2).get_matrix(
+            null_value=Polynomial([0]), neutral_value=Polynomial([1]))
+        det, minor = mat.compute_det_and_minor(
+            0, 15, null_value=Polynomial([0]), neutral_value=Polynomial([1]))
+        self.assertEqual(mat.compute_det().coefficients, det.coefficients)
+        self.assertEqual(
+            mat.sub_matrix(0, 15).rot_left().compute_det().coefficients, minor.coefficients)
+
+    def test_parallel_det(self):
+        """
+        Test the .compute_det method with worker processes
+        :return:
+        """
+
+        mat = create_knight_grid(2).get_matrix(
+            null_value=Polynomial([0]), neutral_value=Polynomial([1]))
+        self.assertEqual(
+            mat.compute_det().coefficients, mat.compute_det(workers=2).coefficients)
+        self.assertEqual(-2, Matrix([[1, 2], [3, 4]]).compute_det(workers=2))
+
+    def test_checkpoint(self):
+        """
+        Test that an interrupted elimination can be resumed from its checkpoint
+        :return:
+        """
+
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, u"det.checkpoint")
+            mat = create_knight_grid(2).get_matrix(
+                null_value=Polynomial([0]), neutral_value=Polynomial([1]))
+            expected = mat.compute_det(checkpoint_path=path, checkpoint_interval=4)
+            self.assertEqual(expected.coefficients, resume_det(path).coefficients)
+
+            # Interrupted after 6 steps out of 15
+            partial = mat.get_rows()
+            eliminate(partial, 6)
+            Checkpoint(path).save(partial, 6, 15)
+            self.assertEqual(expected.coefficients, resume_det(path).coefficients)
+            self.assertEqual(15, Checkpoint.load(path)[1][u"step"])
+
+            det, minor = mat.compute_det_and_minor(
+                3, 5, null_value=Polynomial([0]), neutral_value=Polynomial([1]),
+                checkpoint_path=path, checkpoint_interval=7)
+            resumed_det, resumed_minor = resume_det(path)
+            self.assertEqual(det.coefficients, resumed_det.coefficients)
+            self.assertEqual(minor.coefficients, resumed_minor.coefficients)
+            self.assertEqual([u"det.checkpoint"], os.listdir(directory))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_sparse_det(self):
+        """
+        Test the .compute_sparse_det method computing the determinant
+        :return:
+        """
+
+        self.assertEqual(1, Matrix([]).compute_sparse_det())
+        self.assertEqual(1, Matrix([]).compute_det())
+        self.assertEqual(1, Matrix([[1]]).compute_sparse_det())
+        self.assertEqual(-2, Matrix([[1, 2], [3, 4]]).compute_sparse_det())
+        self.assertEqual(-1, Matrix([[0, 1], [1, 0]]).compute_sparse_det())
+        self.assertEqual(0, Matrix([[1, 2], [2, 4]]).compute_sparse_det())
+        self.assertEqual(0, Matrix([[0, 1], [0, 2]]).compute_sparse_det())
+        self.assertEqual(21, Matrix([[0, 0, 3], [1, 0, 5], [2, 7, 0]]).compute_sparse_det())
+
+        mat = create_knight_grid(2).get_matrix(
+            null_value=Polynomial([0]), neutral_value=Polynomial([1]))
+        self.assertEqual(mat.compute_det().coefficients, mat.compute_sparse_det().coefficients)
+
+    def test_permutation_parity(self):
+        """
+        Test the `permutation_parity` function
+        :return:
+        """
+
+        self.assertEqual(0, permutation_parity([]))
+        self.assertEqual(0, permutation_parity([0, 1, 2]))
+        self.assertEqual(1, permutation_parity([1, 0, 2]))
+        self.assertEqual(0, permutation_parity([1, 2, 0]))
+
     def test_fill_diagonal(self):
         """
         Test the .fill_diagonal method
@@ -106,6 +212,26 @@ class TestMatrix(unittest.TestCase):
             )).rot_left().coefficients
         )
 
+    def test_views(self):
+        """
+        Test that `sub_matrix`, `rot_left` and `permute` share the storage of the matrix
+        :return:
+        """
+
+        mat = Matrix([
+            [1, 2, 3],
+            [4, 5, 6],
+            [7, 8, 9]
+        ])
+        view = mat.sub_matrix(1, 0).rot_left().permute([1, 0], [1, 0])
+        self.assertIs(mat.storage, view.storage)
+        self.assertEqual(((8, 9), (2, 3)), view.coefficients)
+        self.assertEqual((2, 2), view.get_size())
+        self.assertEqual(9, view.get_coefficient(0, 1))
+        self.assertEqual(mat.sub_matrix(1, 0).compute_det(), -view.compute_det())
+        self.assertEqual(
+            mat.sub_matrix(0, 1).compute_det(), mat.compute_det_and_minor(0, 1)[1])
+
 
 if __name__ == u"__main__":
     unittest.main()
@@ -0,0 +1,84 @@
+# -*- coding: utf8 -*-
+
+"""
+Unit-test for the modular module
+"""
+
+from fractions import Fraction
+import unittest
+
+from resistor_grid.circuit import Circuit, create_knight_grid
+from resistor_grid.modular import compute_resistance, crt, det_mod, is_prime, \
+    rational_reconstruction
+
+
+class TestModular(unittest.TestCase):
+    """
+    The TestCase for the modular module
+    """
+
+    def test_is_prime(self):
+        """
+        Test the `is_prime` function
+        :return:
+        """
+
+        self.assertEqual([2, 3, 5, 7, 11, 13], [i for i in range(15) if is_prime(i)])
+        self.assertTrue(is_prime(2147483647))
+        self.assertFalse(is_prime(2147483649))
+
+    def test_det_mod(self):
+        """
+        Test the `det_mod` function
+        :return:
+        """
+
+        rows = [{0: 1, 1: 2}, {0: 3, 1: 4}]
+        self.assertEqual(5, det_mod(rows, set(), 7))
+        self.assertEqual(4, det_mod(rows, set([0]), 7))
+        self.assertEqual(6, det_mod([{1: 1}, {0: 1}], set(), 7))
+
+    def test_reconstruction(self):
+        """
+        Test the `crt` and `rational_reconstruction` functions
+        :return:
+        """
+
+        value, modulus = crt(0, 1, 2, 7)
+        value, modulus = crt(value, modulus, 3, 11)
+        self.assertEqual((58, 77), (value, modulus))
+        self.assertEqual(Fraction(-2, 3), rational_reconstruction(-2 * pow(3, -1, 101), 101))
+        self.assertEqual(Fraction(73, 69), rational_reconstruction(
+            73 * pow(69, -1, 2147483647), 2147483647))
+
+    def test_compute_resistance(self):
+        """
+        Test the `compute_resistance` function
+        :return:
+        """
+
+        circuit = Circuit(3)
+        circuit.set(0, 2, 2)
+        circuit.set(2, 1, 3)
+        circuit.set(0, 1, Fraction(5, 2))
+        self.assertEqual(Fraction(5, 3), compute_resistance(circuit))
+
+        circuit = create_knight_grid(4, open_value=None)
+        self.assertEqual(
+            compute_resistance(circuit), compute_resistance(circuit, early_stop=3))
+
+        self.assertEqual(Fraction(2555, 2415), compute_resistance(create_knight_grid(3)))
+
+        circuit = Circuit(4)
+        circuit.set(0, 1, 1)
+        circuit.set(2, 3, 1)
+        self.assertRaises(Exception, compute_resistance, circuit, 0, 2)
+
+        # A node without resistors does not change the resistance
+        circuit = Circuit(3)
+        circuit.set(0, 1, 1)
+        self.assertEqual(1, compute_resistance(circuit))
+
+
+if __name__ == '__main__':
+    unittest.main()
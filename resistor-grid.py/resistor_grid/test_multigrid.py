@@ -0,0 +1,73 @@
+# -*- coding: utf8 -*-
+
+"""
+Unit-test for the multigrid module
+"""
+
+import unittest
+
+from resistor_grid import laplacian
+from resistor_grid.circuit import create_grid, create_knight_grid
+from resistor_grid.multigrid import GridMultigrid, compute_grid_resistance, \
+    compute_knight_resistance, get_grid_laplacian, get_interpolation, get_knight_positions, numpy
+from resistor_grid.numeric import get_conductance_matrix
+
+
+@unittest.skipIf(numpy is None, u"numpy and scipy are not installed")
+class TestMultigrid(unittest.TestCase):
+    """
+    The TestCase for the multigrid module
+    """
+
+    def test_grid_laplacian(self):
+        """
+        Test that `get_grid_laplacian` matches the conductance matrix of `create_grid`
+        :return:
+        """
+
+        expected = get_conductance_matrix(create_grid(4, 3, open_value=None)).toarray()
+        self.assertEqual(expected.tolist(), get_grid_laplacian(4, 3).toarray().tolist())
+
+    def test_interpolation(self):
+        """
+        Test the `get_interpolation` function with an odd and an even number of points
+        :return:
+        """
+
+        self.assertEqual([[1, 0, 0], [0.5, 0.5, 0], [0, 1, 0], [0, 0.5, 0.5], [0, 0, 1]],
+                         get_interpolation(5).toarray().tolist())
+        self.assertEqual([[1, 0, 0], [0.5, 0.5, 0], [0, 1, 0], [0, 0, 1]],
+                         get_interpolation(4).toarray().tolist())
+
+    def test_knight_positions(self):
+        """
+        Test the `get_knight_positions` function
+        :return:
+        """
+
+        self.assertEqual(((0, 2), (2, 1)), get_knight_positions(3))
+        self.assertEqual(((1, 1), (2, 3)), get_knight_positions(4))
+
+    def test_compute_resistance(self):
+        """
+        Test that the multigrid solver matches the nodal analysis within the tolerance
+        :return:
+        """
+
+        for width in (3, 10, 11):
+            expected = float(laplacian.compute_resistance(create_knight_grid(width)))
+            for cycle in (u"V", u"W"):
+                resistance, error = compute_knight_resistance(width, 1e-11, cycle)
+                self.assertLess(error, 1e-11)
+                self.assertAlmostEqual(expected, resistance, places=10)
+
+        expected = float(laplacian.compute_resistance(create_grid(40, 30, open_value=None),
+                                                      5, 1000, exact=False))
+        resistance, _ = compute_grid_resistance(40, 30, (5, 0), (0, 25), 1e-12)
+        self.assertAlmostEqual(expected, resistance, places=10)
+        self.assertEqual([40, 21, 11, 6], [level.width for level in GridMultigrid(40, 30).levels])
+        self.assertRaises(Exception, GridMultigrid, 4, 4, u"X")
+
+
+if __name__ == '__main__':
+    unittest.main()
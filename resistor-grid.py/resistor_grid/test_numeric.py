@@ -0,0 +1,81 @@
+# -*- coding: utf8 -*-
+
+"""
+Unit-test for the numeric module
+"""
+
+import unittest
+
+from resistor_grid import laplacian
+from resistor_grid.circuit import Circuit, create_grid, create_knight_grid
+from resistor_grid.numeric import compute_resistance, compute_resistances, \
+    get_conductance_matrix, numpy
+
+
+@unittest.skipIf(numpy is None, u"numpy and scipy are not installed")
+class TestNumeric(unittest.TestCase):
+    """
+    The TestCase for the numeric module
+    """
+
+    def test_conductance_matrix(self):
+        """
+        Test the `get_conductance_matrix` function
+        :return:
+        """
+
+        circuit = Circuit(3)
+        circuit.set(0, 1, 1)
+        circuit.set(1, 2, 2)
+        self.assertEqual(
+            [[1.0, -1.0, 0.0], [-1.0, 1.5, -0.5], [0.0, -0.5, 0.5]],
+            get_conductance_matrix(circuit).toarray().tolist()
+        )
+
+    def test_compute_resistance(self):
+        """
+        Test the `compute_resistance` function with both methods
+        :return:
+        """
+
+        circuit = create_knight_grid(3, open_value=None)
+        self.assertAlmostEqual(2555.0 / 2415.0, compute_resistance(circuit))
+        self.assertAlmostEqual(2555.0 / 2415.0, compute_resistance(circuit, method=u"cg"))
+        self.assertAlmostEqual(
+            compute_resistance(circuit, 4, 7), compute_resistance(circuit, 7, 4))
+        self.assertRaises(Exception, compute_resistance, circuit, method=u"unknown")
+
+    def test_compute_resistances(self):
+        """
+        Test that the `compute_resistances` function matches the exact nodal analysis
+        :return:
+        """
+
+        circuit = create_grid(4, 3, open_value=None)
+        pairs = [(5, 0), (5, 11), (3, 8), (5, 6)]
+        resistances = compute_resistances(circuit, pairs)
+        self.assertEqual((4,), resistances.shape)
+        for expected, resistance in zip(laplacian.compute_resistances(circuit, pairs),
+                                        resistances):
+            self.assertAlmostEqual(float(expected), resistance)
+        self.assertRaises(Exception, compute_resistances, circuit, [(1, 1)])
+
+    def test_disconnected(self):
+        """
+        Test that the nodes disconnected from the terminals are ignored, and detected when they
+        are terminals
+        :return:
+        """
+
+        circuit = Circuit(4)
+        circuit.set(0, 1, 1)
+        circuit.set(1, 3, 2)
+        self.assertAlmostEqual(3.0, compute_resistance(circuit, 3, 0))
+        self.assertAlmostEqual(3.0, compute_resistance(circuit, 3, 0, method=u"cg"))
+        self.assertEqual([1.0, 2.0], compute_resistances(circuit, [(0, 1), (1, 3)]).tolist())
+        self.assertRaises(Exception, compute_resistance, circuit, 0, 2)
+        self.assertRaises(Exception, compute_resistances, circuit, [(0, 1), (2, 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
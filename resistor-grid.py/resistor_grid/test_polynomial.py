@@ -6,7 +6,8 @@ Unit-test for the Polynomial class
 
 import unittest
 
-from resistor_grid.polynomial import Polynomial
+from resistor_grid.polynomial import Polynomial, divide_exact_coefficients, \
+    karatsuba_multiply, kronecker_multiply, schoolbook_multiply
 
 
 class TestPolynomial(unittest.TestCase):
@@ -36,6 +37,16 @@ class TestPolynomial(unittest.TestCase):
         self.assertEqual(0, Polynomial([1]).deg())
         self.assertEqual(1, Polynomial([0, 1]).deg())
 
+    def test_bool(self):
+        """
+        Test the truth value of polynomials
+        :return:
+        """
+
+        self.assertFalse(Polynomial([]))
+        self.assertTrue(Polynomial([1]))
+        self.assertTrue(Polynomial([0, 1]))
+
     def test_add(self):
         """
         Test the .add method
@@ -71,6 +82,23 @@ class TestPolynomial(unittest.TestCase):
         self.assertEqual((6,), Polynomial([2]).mul(Polynomial([3])).coefficients)
         self.assertEqual((-1, 0, 1), Polynomial([1, 1]).mul(Polynomial([-1, 1])).coefficients)
 
+    def test_fast_mul(self):
+        """
+        Test that the Karatsuba and Kronecker products match the schoolbook product
+        :return:
+        """
+
+        coefficients1 = [(-1) ** i * (i * 7919 % 1009) ** 3 for i in range(70)]
+        coefficients2 = [(i * 104729 % 997) - 500 for i in range(50)]
+        expected = schoolbook_multiply(coefficients1, coefficients2)
+        self.assertEqual(expected, karatsuba_multiply(coefficients1, coefficients2))
+        self.assertEqual(expected, kronecker_multiply(coefficients1, coefficients2))
+        self.assertEqual(
+            tuple(expected),
+            Polynomial(coefficients1).mul(Polynomial(coefficients2)).coefficients
+        )
+        self.assertEqual([-2, 0, 2], kronecker_multiply([-1, -1], [2, -2]))
+
     def test_div(self):
         """
         Test the .div method
@@ -79,6 +107,54 @@ class TestPolynomial(unittest.TestCase):
 
         self.assertEqual((-1, 1), Polynomial([-1, 0, 1]).div(Polynomial([1, 1])).coefficients)
 
+        coefficients1 = [(i * 7919 % 1009) - 504 for i in range(40)]
+        coefficients2 = [(i * 104729 % 997) - 500 for i in range(30)]
+        product = Polynomial(coefficients1).mul(Polynomial(coefficients2))
+        self.assertEqual(tuple(coefficients1), product.div(Polynomial(coefficients2)).coefficients)
+        self.assertEqual(
+            coefficients1, divide_exact_coefficients(product.coefficients, coefficients2))
+        self.assertEqual(None, divide_exact_coefficients([1, 0, 1], [1, 1]))
+
+        # The coefficients of the divisor are much larger than the ones of the dividend
+        dividend = Polynomial([1])
+        divisor = Polynomial([1])
+        for _ in range(5):
+            dividend *= Polynomial([-1] + [0] * 999 + [1])
+            divisor *= Polynomial([1] * 1000)
+        self.assertEqual((-1, 5, -10, 10, -5, 1), dividend.div(divisor).coefficients)
+
+    def test_bareiss_update(self):
+        """
+        Test the .bareiss_update method
+        :return:
+        """
+
+        value = Polynomial([1, 2])
+        pivot = Polynomial([3, 0, 1])
+        left = Polynomial([-1, 1])
+        top = Polynomial([7, 5])
+        divisor = Polynomial([1, 1])
+        self.assertEqual(
+            (10, -6, 2),
+            value.bareiss_update(pivot, left, top, divisor).coefficients
+        )
+        self.assertEqual(
+            (value * pivot - left * top).coefficients,
+            value.bareiss_update(pivot, left, top).coefficients
+        )
+        self.assertEqual((), pivot.bareiss_update(value, value, pivot, divisor).coefficients)
+
+        # A previous pivot with much larger coefficients than the other polynomials
+        value = Polynomial([1])
+        divisor = Polynomial([1])
+        for _ in range(4):
+            value *= Polynomial([-1] + [0] * 999 + [1])
+            divisor *= Polynomial([1] * 1000)
+        self.assertEqual(
+            (1, -5, 10, -10, 5, -1),
+            value.bareiss_update(Polynomial([1]), Polynomial([1]), Polynomial([0, 1]) * value,
+                                 divisor).coefficients
+        )
 
     def test_str(self):
         """
@@ -0,0 +1,72 @@
+# -*- coding: utf8 -*-
+
+"""
+Unit-test for the reduction module
+"""
+
+from fractions import Fraction
+import unittest
+
+from resistor_grid.circuit import Circuit, SparseCircuit, create_knight_grid
+from resistor_grid.reduction import compute_resistance, eliminate_node, get_graph, reduce_graph
+
+
+class TestReduction(unittest.TestCase):
+    """
+    The TestCase for the reduction module
+    """
+
+    def test_eliminate_node(self):
+        """
+        Test the `eliminate_node` function on a star (Y-Δ transform)
+        :return:
+        """
+
+        circuit = SparseCircuit(4)
+        circuit.set(3, 0, 1)
+        circuit.set(3, 1, 2)
+        circuit.set(3, 2, Fraction(1, 3))
+        graph = get_graph(circuit)
+        eliminate_node(graph, 3)
+        self.assertEqual(None, graph[3])
+        self.assertEqual({1: Fraction(1, 9), 2: Fraction(2, 3)}, graph[0])
+        self.assertEqual({0: Fraction(1, 9), 2: Fraction(1, 3)}, graph[1])
+
+    def test_reduce_graph(self):
+        """
+        Test that the `reduce_graph` function eliminates the nodes by increasing degree
+        :return:
+        """
+
+        circuit = SparseCircuit(5)
+        for node in (2, 3, 4):
+            circuit.set(0, node, 1)
+            circuit.set(1, node, 1)
+        circuit.set(2, 3, 1)
+        graph = get_graph(circuit)
+        self.assertEqual([4, 2, 3], reduce_graph(graph, (0, 1)))
+        self.assertEqual([{1: Fraction(3, 2)}, {0: Fraction(3, 2)}], graph[:2])
+
+    def test_compute_resistance(self):
+        """
+        Test the `compute_resistance` function
+        :return:
+        """
+
+        circuit = Circuit(3)
+        circuit.set(0, 2, 1)
+        circuit.set(2, 1, 2)
+        circuit.set(0, 1, 6)
+        self.assertEqual(2, compute_resistance(circuit))
+        self.assertEqual(Fraction(14, 9), compute_resistance(circuit, 1, 2))
+        self.assertAlmostEqual(14.0 / 9.0, compute_resistance(circuit, 1, 2, exact=False))
+        self.assertEqual(Fraction(2555, 2415), compute_resistance(create_knight_grid(3)))
+
+        circuit = Circuit(4)
+        circuit.set(0, 2, 1)
+        circuit.set(1, 3, 1)
+        self.assertRaises(Exception, compute_resistance, circuit)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+# -*- coding: utf8 -*-
+
+"""
+Unit-test for the serialization module
+"""
+
+from fractions import Fraction
+import io
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from resistor_grid import laplacian
+from resistor_grid.circuit import SparseCircuit, create_knight_grid
+from resistor_grid.serialization import MappedCircuit, convert_netlist, numpy, parse_value, \
+    read_netlist, write_arrays, write_circuit, write_netlist
+
+
+@unittest.skipIf(numpy is None, u"numpy and scipy are not installed")
+class TestSerialization(unittest.TestCase):
+    """
+    The TestCase for the serialization module
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, u"circuit.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        """
+        Test `write_circuit`, then the arrays and `to_circuit` of `MappedCircuit`
+        :return:
+        """
+
+        circuit = create_knight_grid(4)
+        write_circuit(self.path, circuit)
+        with MappedCircuit(self.path) as mapped:
+            self.assertEqual((20, 0, 1, 31), (mapped.size, mapped.node1, mapped.node2,
+                                              mapped.get_edge_count()))
+            self.assertEqual([1.0], mapped.values.tolist())
+            self.assertEqual(0, mapped.indptr[0])
+            self.assertEqual(31, mapped.indptr[-1])
+            self.assertFalse(mapped.indices.flags.writeable)
+            loaded = mapped.to_circuit()
+            self.assertEqual(sorted((node1, node2) for node1, node2, value in
+                                    circuit.get_edges(skip_default=True)
+                                    if laplacian.get_conductance(value) != 0),
+                             sorted((node1, node2) for node1, node2, _ in
+                                    loaded.get_edges(skip_default=True)))
+            resistance = laplacian.compute_resistance(circuit)
+            self.assertEqual(resistance, laplacian.compute_resistance(loaded))
+            self.assertAlmostEqual(float(resistance), mapped.compute_resistance())
+            self.assertAlmostEqual(float(resistance),
+                                   laplacian.compute_resistance(mapped, exact=False))
+
+    def test_write_arrays(self):
+        """
+        Test the terminals, the merged parallel resistors and the skipped open resistors
+        :return:
+        """
+
+        write_arrays(self.path, 4, [2, 0, 1, 1, 3], [0, 1, 0, 3, 2],
+                     [2.0, 4.0, 4.0, float(u"inf"), 3.0], node1=3, node2=0)
+        with MappedCircuit(self.path) as mapped:
+            self.assertEqual((3, 0), (mapped.node1, mapped.node2))
+            self.assertEqual([(0, 1, 2.0), (0, 2, 2.0), (2, 3, 3.0)], list(mapped.get_edges()))
+            self.assertEqual([2.0, 3.0], mapped.values.tolist())
+            self.assertAlmostEqual(5.0, mapped.compute_resistance())
+
+        self.assertRaises(Exception, write_arrays, self.path, 2, [0], [0], [1.0])
+        self.assertRaises(Exception, write_arrays, self.path, 2, [0], [1], [0.0])
+        self.assertRaises(Exception, write_arrays, self.path, 2, [0], [1], [1.0], node1=1,
+                          node2=1)
+        with open(self.path, u"wb") as circuit_file:
+            circuit_file.write(b"not a circuit")
+        self.assertRaises(Exception, MappedCircuit, self.path)
+
+    def test_pickle(self):
+        """
+        Test that a `MappedCircuit` is pickled as its path
+        :return:
+        """
+
+        write_circuit(self.path, create_knight_grid(3), 1, 0)
+        with MappedCircuit(self.path) as mapped:
+            data = pickle.dumps(mapped)
+            self.assertLess(len(data), 200)
+        with pickle.loads(data) as mapped:
+            self.assertEqual((1, 0), (mapped.node1, mapped.node2))
+            self.assertAlmostEqual(
+                float(laplacian.compute_resistance(create_knight_grid(3))),
+                mapped.compute_resistance())
+
+    def test_netlist(self):
+        """
+        Test `read_netlist`, `write_netlist` and `convert_netlist`
+        :return:
+        """
+
+        self.assertEqual(4700.0, parse_value(u"4.7k"))
+        self.assertEqual(2e6, parse_value(u"2MEG"))
+        self.assertAlmostEqual(1e-3, parse_value(u"1mOhm"))
+        self.assertRaises(Exception, parse_value, u"k")
+
+        lines = [u"* a divider\n", u"R1 in mid 1k ; top\n", u"\n", u"mid gnd 1e3 # bottom\n",
+                 u".end\n"]
+        self.assertEqual([(u"in", u"mid", 1000.0), (u"mid", u"gnd", 1000.0)],
+                         list(read_netlist(lines)))
+        self.assertRaises(Exception, list, read_netlist([u"R1 in\n"]))
+
+        circuit = SparseCircuit(3)
+        circuit.set(0, 2, 1)
+        circuit.set(2, 1, Fraction(1, 2))
+        netlist = io.StringIO()
+        write_netlist(netlist, circuit)
+        self.assertEqual(u"0 2 1.0\n1 2 0.5\n", netlist.getvalue())
+
+        netlist_path = os.path.join(self.directory, u"circuit.cir")
+        with open(netlist_path, u"w") as netlist_file:
+            netlist_file.writelines(lines)
+        self.assertEqual(3, convert_netlist(netlist_path, self.path, u"in", u"gnd"))
+        with MappedCircuit(self.path) as mapped:
+            self.assertEqual((0, 2), (mapped.node1, mapped.node2))
+            self.assertAlmostEqual(2000.0, mapped.compute_resistance())
+        self.assertRaises(Exception, convert_netlist, netlist_path, self.path, u"out")
+
+
+if __name__ == '__main__':
+    unittest.main()
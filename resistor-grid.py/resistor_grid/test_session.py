@@ -0,0 +1,65 @@
+# -*- coding: utf8 -*-
+
+"""
+Unit-test for the session module
+"""
+
+from fractions import Fraction
+import unittest
+
+from resistor_grid import laplacian
+from resistor_grid.circuit import Circuit, create_knight_grid
+from resistor_grid.session import SolveSession, solve_dense
+
+
+class TestSession(unittest.TestCase):
+    """
+    The TestCase for the session module
+    """
+
+    def test_solve_dense(self):
+        """
+        Test the `solve_dense` function
+        :return:
+        """
+
+        mat = [[Fraction(0), Fraction(1)], [Fraction(2), Fraction(1)]]
+        self.assertEqual([1, 2], solve_dense(mat, [Fraction(2), Fraction(4)]))
+        self.assertRaises(Exception, solve_dense, [[1, 2], [2, 4]], [1, 2])
+
+    def test_set(self):
+        """
+        Test that the session matches a new nodal analysis after each change
+        :return:
+        """
+
+        circuit = create_knight_grid(4, open_value=None)
+        session = SolveSession(circuit)
+        self.assertEqual(laplacian.compute_resistance(circuit), session.get_resistance())
+        initial = circuit.get(5, 9)
+        for node1, node2, value in ((0, 2, 3), (5, 9, Fraction(1, 2)), (3, 7, None), (0, 1, 2),
+                                    (5, 9, initial)):
+            session.set(node1, node2, value)
+            self.assertEqual(laplacian.compute_resistance(circuit), session.get_resistance())
+        self.assertEqual(3, len(session.changes))
+
+    def test_max_rank(self):
+        """
+        Test that the circuit is factorized again after `max_rank` changes
+        :return:
+        """
+
+        circuit = Circuit(3)
+        circuit.set(0, 2, 1)
+        circuit.set(2, 1, 2)
+        circuit.set(0, 1, 6)
+        session = SolveSession(circuit, 1, 2, max_rank=1, exact=False)
+        session.set(0, 1, 3)
+        self.assertEqual(1, len(session.changes))
+        session.set(0, 2, 2)
+        self.assertEqual(0, len(session.changes))
+        self.assertAlmostEqual(10.0 / 7.0, session.get_resistance())
+
+
+if __name__ == '__main__':
+    unittest.main()
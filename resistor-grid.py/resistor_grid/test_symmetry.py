@@ -0,0 +1,93 @@
+# -*- coding: utf8 -*-
+
+"""
+Unit-test for the symmetry module
+"""
+
+from fractions import Fraction
+import unittest
+
+from resistor_grid import laplacian
+from resistor_grid.circuit import create_grid, create_knight_grid
+from resistor_grid.reduction import get_graph
+from resistor_grid.symmetry import compute_resistance, find_symmetry, get_grid_symmetries, \
+    get_knight_symmetries, get_quotient, is_symmetry
+
+
+class TestSymmetry(unittest.TestCase):
+    """
+    The TestCase for the symmetry module
+    """
+
+    def test_grid_symmetries(self):
+        """
+        Test the `get_grid_symmetries` function, with swapped nodes
+        :return:
+        """
+
+        self.assertEqual([[1, 0, 3, 2], [2, 3, 0, 1], [3, 2, 1, 0]], get_grid_symmetries(2, 2)[:3])
+        self.assertEqual(5, len(get_grid_symmetries(2, 2)))
+        self.assertEqual([[0, 2, 1], [0, 1, 2], [0, 2, 1]], get_grid_symmetries(3, 1, [(0, 1)]))
+        self.assertEqual(3, len(get_grid_symmetries(3, 1)))
+
+    def test_is_symmetry(self):
+        """
+        Test the `is_symmetry` and `find_symmetry` functions
+        :return:
+        """
+
+        circuit = create_grid(3, 2, open_value=None)
+        graph = get_graph(circuit)
+        flip, _, rotation = get_grid_symmetries(3, 2)
+        self.assertTrue(is_symmetry(graph, flip, 1, 4))
+        self.assertTrue(is_symmetry(graph, rotation, 0, 5))
+        self.assertFalse(is_symmetry(graph, flip, 0, 4))
+        self.assertEqual(rotation, find_symmetry(graph, 0, 5, get_grid_symmetries(3, 2)))
+        self.assertEqual(None, find_symmetry(graph, 0, 4, get_grid_symmetries(3, 2)))
+        circuit.set(0, 1, 2)
+        self.assertFalse(is_symmetry(get_graph(circuit), rotation, 0, 5))
+
+    def test_quotient(self):
+        """
+        Test the size of the reduced systems
+        :return:
+        """
+
+        graph = get_graph(create_grid(3, 3, open_value=None))
+        flip, _, rotation, _, _ = get_grid_symmetries(3, 3)
+        # Symmetric: the 3 columns are merged into 2
+        rows, classes, _, ground = get_quotient(graph, flip, 1, 7)
+        self.assertEqual(6, len(rows))
+        self.assertEqual(classes[7], ground)
+        # Antisymmetric: 4 pairs and the ground (center)
+        rows, classes, coefficients, ground = get_quotient(graph, rotation, 0, 8)
+        self.assertEqual(5, len(rows))
+        self.assertEqual((1, -1, 0), (coefficients[0], coefficients[8], coefficients[4]))
+        self.assertEqual(ground, classes[4])
+
+    def test_compute_resistance(self):
+        """
+        Test that the `compute_resistance` function matches the whole nodal analysis
+        :return:
+        """
+
+        circuit = create_grid(3, 3, open_value=None)
+        for symmetry in get_grid_symmetries(3, 3):
+            for node1, node2 in ((0, 8), (3, 5), (0, 4), (1, 7)):
+                if is_symmetry(get_graph(circuit), symmetry, node1, node2):
+                    self.assertEqual(laplacian.compute_resistance(circuit, node1, node2),
+                                     compute_resistance(circuit, node1, node2, symmetry))
+        self.assertRaises(Exception, compute_resistance, circuit, 0, 4,
+                          get_grid_symmetries(3, 3)[0])
+        self.assertEqual(Fraction(7, 8), compute_resistance(circuit, 0, 4))
+
+        for width in (3, 4):
+            circuit = create_knight_grid(width)
+            self.assertEqual(laplacian.compute_resistance(circuit), compute_resistance(
+                circuit, candidates=get_knight_symmetries(width)))
+        self.assertAlmostEqual(73.0 / 69.0, compute_resistance(
+            create_knight_grid(3), candidates=get_knight_symmetries(3), exact=False))
+
+
+if __name__ == '__main__':
+    unittest.main()
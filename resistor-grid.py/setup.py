@@ -7,4 +7,6 @@ setup(name="ResistorGrid",
     author="Charles Samborski",
     packages=["resistor_grid"],
     install_requires=[],
+    extras_require={"numeric": ["numpy", "scipy>=1.12"]},
+    entry_points={"console_scripts": ["resistor-grid=resistor_grid.main:main"]},
     classifiers=["Development Status :: 3 - Alpha"])